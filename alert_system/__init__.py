@@ -1,2 +1,4 @@
 from .alert_manager import check_price_alert, check_rsi_alert
-from .scheduler import start_scheduler, alerts
+from .scheduler import start_scheduler, alerts, alert_queue
+from .adaptive import AlertQueue
+from .warmer import CacheWarmer, WarmTarget
@@ -0,0 +1,137 @@
+import heapq
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from market_hours import EXCHANGE_TZ, OPEN_TIME, CLOSE_TIME, add_trading_seconds
+from .alert_manager import get_current_price, get_daily_volatility, get_rsi, price_triggered, rsi_triggered
+
+logger = logging.getLogger(__name__)
+
+# Regular session length, volatility is per trading day
+SESSION_SECONDS = (datetime.combine(datetime.min, CLOSE_TIME) - datetime.combine(datetime.min, OPEN_TIME)).total_seconds()
+RSI_DAILY_SIGMA = 4.0  # typical day to day move of a 14 day RSI, in points
+
+
+class AlertQueue:
+    """
+    Checks each alert when it could plausibly have fired.
+
+    Alerts sit in a heap ordered by their next check time. After every check
+    the time until an alert could trigger is estimated from how far it is
+    from its threshold and how much the ticker moves per day: a move of
+    `sigmas` standard deviations over t days needs t = (distance / (sigmas * daily_sigma))^2.
+    That time is counted in regular session time only, so nothing is due
+    at night, over weekends or on exchange holidays, and it is clamped to
+    [min_interval, max_interval].
+    `alerts` is the list create_alert appends to, new alerts are due right away
+    and alerts removed from it are dropped when they come up.
+    An alert that fired is notified once and then only rechecked every
+    `max_interval`, it fires again after its condition was seen false in between.
+    """
+    def __init__(self, alerts, min_interval=None, max_interval=None, sigmas=None, clock=time.time):
+        self.alerts = alerts
+        self.min_interval = min_interval or float(os.getenv("ALERT_MIN_INTERVAL_SECONDS", 60))
+        self.max_interval = max_interval or float(os.getenv("ALERT_MAX_INTERVAL_SECONDS", SESSION_SECONDS))
+        self.sigmas = sigmas or float(os.getenv("ALERT_SIGMAS", 3))
+        self.clock = clock
+        self._heap = []  # (due timestamp, seq, alert)
+        self._scheduled = {}  # id(alert) -> due timestamp
+        self._fired = set()  # id(alert) of alerts whose condition held at their last check
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {"checks": 0, "triggered": 0, "errors": 0}
+
+    def _push(self, alert, due):
+        self._scheduled[id(alert)] = due
+        heapq.heappush(self._heap, (due, next(self._seq), alert))
+
+    def sync(self, now):
+        for alert in self.alerts:
+            if id(alert) not in self._scheduled:
+                self._push(alert, now)
+
+    def pop_due(self, now=None):
+        """Alerts whose check time has come, in due order."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.sync(now)
+            current = {id(alert) for alert in self.alerts}
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                _, _, alert = heapq.heappop(self._heap)
+                if id(alert) in current:
+                    due.append(alert)
+                else:
+                    del self._scheduled[id(alert)]
+                    self._fired.discard(id(alert))
+            return due
+
+    def reschedule(self, alert, seconds, now=None):
+        # `seconds` of session time from now
+        now = self.clock() if now is None else now
+        due = add_trading_seconds(datetime.fromtimestamp(now, EXCHANGE_TZ), seconds).timestamp()
+        with self._lock:
+            self._push(alert, due)
+        return due
+
+    def interval(self, distance, daily_sigma):
+        """Session seconds until a move of `distance` becomes plausible."""
+        if daily_sigma is None or not daily_sigma > 0 or math.isnan(daily_sigma):
+            return self.min_interval
+        days = (distance / (self.sigmas * daily_sigma)) ** 2
+        return min(max(days * SESSION_SECONDS, self.min_interval), self.max_interval)
+
+    def evaluate(self, alert):
+        """(triggered, session seconds until the next check)"""
+        if alert['type'] == 'price':
+            price = get_current_price(alert['ticker'])
+            triggered = price_triggered(price, alert['target'], alert['direction'])
+            distance = abs(math.log(alert['target'] / price)) if price > 0 and alert['target'] > 0 else 0.0
+            return triggered, self.interval(distance, get_daily_volatility(alert['ticker']))
+        if alert['type'] == 'rsi':
+            rsi = get_rsi(alert['ticker'])
+            return rsi_triggered(rsi, alert['threshold'], alert['direction']), self.interval(abs(rsi - alert['threshold']), RSI_DAILY_SIGMA)
+        return False, self.max_interval
+
+    def run(self, now=None, on_trigger=None):
+        """Check every due alert and schedule its next check, returns the number checked."""
+        now = self.clock() if now is None else now
+        due = self.pop_due(now)
+        for alert in due:
+            seconds = self.min_interval
+            try:
+                triggered, seconds = self.evaluate(alert)
+                self.stats["checks"] += 1
+                if not triggered:
+                    self._fired.discard(id(alert))
+                else:
+                    # Sitting on its threshold, checking every minute would only repeat the notification
+                    seconds = self.max_interval
+                    if id(alert) not in self._fired:
+                        self.stats["triggered"] += 1
+                        if on_trigger is not None:
+                            on_trigger(alert)
+                        self._fired.add(id(alert))
+            except Exception as e:
+                # A failed notification is retried with the next check
+                logger.warning(f"Checking alert {alert.get('type')} {alert.get('ticker')} failed: {e}")
+                self.stats["errors"] += 1
+                seconds = self.min_interval
+            finally:
+                # Always back in the heap, an alert left out would never be checked again
+                self.reschedule(alert, seconds, now)
+        return len(due)
+
+    def summary(self):
+        with self._lock:
+            next_due = self._heap[0][0] if self._heap else None
+            return {
+                "scheduled": len(self._scheduled),
+                "next_due_in": round(next_due - self.clock(), 1) if next_due is not None else None,
+                **self.stats,
+            }
@@ -1,19 +1,63 @@
-import yfinance as yf
-import ta 
+import math
+import os
 
-def check_price_alert(ticker, target_price, direction="above"):
-    data = yf.Ticker(ticker).history(period="1d")
-    current_price = data["Close"].iloc[-1]
+from cache import TTLCache
+from market_data import get_market_provider
+from quote_hub import get_quote_hub
+
+VOLATILITY_CACHE = TTLCache(ttl=int(os.getenv("VOLATILITY_CACHE_TTL", 6 * 3600)))  # ticker -> daily volatility
+RSI_CACHE = TTLCache(ttl=int(os.getenv("RSI_CACHE_TTL", 60)))                        # ticker -> latest RSI
+
+# Wilder's smoothing never forgets its first bar. With ~125 bars of warm-up the RSI is within
+# a hundredth of one computed over years of closes, like backtest.rsi() does, 1mo (~21 bars)
+# was off by up to ~10 points.
+RSI_HISTORY_PERIOD = "6mo"
+
+def get_current_price(ticker):
+    # Reuse the live quote snapshot when a dashboard (or an earlier alert) already fetched this ticker
+    hub = get_quote_hub()
+    quote = hub.latest(ticker, max_age=2 * hub.interval())
+    if quote is not None:
+        return quote["price"]
+    data = get_market_provider().history(ticker, "1d")
+    return hub.publish(ticker, round(float(data["Close"].iloc[-1]), 2))["price"]
+
+def get_daily_volatility(ticker):
+    # Standard deviation of daily log returns over the last month, None without enough data
+    volatility = VOLATILITY_CACHE.get(ticker)
+    if volatility is None:
+        closes = get_market_provider().history(ticker, "1mo")["Close"].dropna()
+        if len(closes) < 3:
+            return None
+        volatility = float(closes.apply(math.log).diff().std())
+        VOLATILITY_CACHE.set(ticker, volatility)
+    return volatility
+
+def get_rsi(ticker):
+    # Shared by every RSI alert on the ticker that is due around the same time
+    rsi = RSI_CACHE.get(ticker)
+    if rsi is None:
+        import ta  # pulls in pandas, only needed once an RSI alert is checked
+        df = get_market_provider().history(ticker, RSI_HISTORY_PERIOD)
+        rsi = float(ta.momentum.RSIIndicator(df["Close"]).rsi().iloc[-1])
+        RSI_CACHE.set(ticker, rsi)
+    return rsi
+
+def price_triggered(current_price, target_price, direction="above"):
     if direction == "above" and current_price >= target_price:
         return True
     elif direction == "below" and current_price <= target_price:
         return True
     return False
 
-def check_rsi_alert(ticker, threshold=30, direction="below"):
-    df = yf.download(ticker, period="21d")
-    rsi = ta.momentum.RSIIndicator(df["Close"]).rsi().iloc[-1]
+def rsi_triggered(rsi, threshold=30, direction="below"):
     if direction == "below":
         return rsi < threshold
     else:
         return rsi > threshold
+
+def check_price_alert(ticker, target_price, direction="above"):
+    return price_triggered(get_current_price(ticker), target_price, direction)
+
+def check_rsi_alert(ticker, threshold=30, direction="below"):
+    return rsi_triggered(get_rsi(ticker), threshold, direction)
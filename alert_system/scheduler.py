@@ -1,9 +1,28 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+import os
+
+from .adaptive import AlertQueue
 from .alert_manager import check_price_alert, check_rsi_alert
+from profiler import get_profiler
 
 alerts = []  # This should be replaced with DB storage in production
+alert_queue = AlertQueue(alerts)
+ALERT_TICK_SECONDS = int(os.getenv("ALERT_TICK_SECONDS", 30))  # how often the queue is looked at
+
+def notify(alert):
+    print(f"[ALERT TRIGGERED] {alert}")
+    # TODO: Send notification (email, SMS, etc.)
+
+def check_due_alerts():
+    # Only the alerts alert_queue considers due, see AlertQueue
+    with get_profiler().maybe_trace("check_alerts", label="due alerts"):
+        alert_queue.run(on_trigger=notify)
 
 def check_alerts():
+    # Checks every alert regardless of schedule
+    with get_profiler().maybe_trace("check_alerts", label=f"{len(alerts)} alerts"):
+        _check_alerts()
+
+def _check_alerts():
     for alert in alerts:
         if alert['type'] == 'price':
             triggered = check_price_alert(alert['ticker'], alert['target'], alert['direction'])
@@ -13,10 +32,22 @@ def check_alerts():
             triggered = False
 
         if triggered:
-            print(f"[ALERT TRIGGERED] {alert}")
-            # TODO: Send notification (email, SMS, etc.)
+            notify(alert)
+
+def with_app_context(app, job):
+    # Jobs that touch the db (e.g. stored competitor discoveries) need an app context
+    if app is None:
+        return job
+    def run():
+        with app.app_context():
+            return job()
+    return run
 
-def start_scheduler():
+def start_scheduler(warmer=None, app=None):
+    from apscheduler.schedulers.background import BackgroundScheduler
     scheduler = BackgroundScheduler()
-    scheduler.add_job(check_alerts, 'interval', minutes=2)
+    scheduler.add_job(with_app_context(app, check_due_alerts), 'interval', seconds=ALERT_TICK_SECONDS, max_instances=1, coalesce=True)
+    if warmer is not None:
+        scheduler.add_job(with_app_context(app, warmer.run), 'interval', seconds=warmer.interval, max_instances=1, coalesce=True)
     scheduler.start()
+    return scheduler
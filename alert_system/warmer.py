@@ -0,0 +1,110 @@
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+
+from rate_limit import get_limiter
+
+logger = logging.getLogger(__name__)
+
+# expires_in(company, ticker) -> seconds left or None, refresh(company, ticker) reloads the entry,
+# cost maps provider name -> calls a refresh is expected to make
+WarmTarget = namedtuple("WarmTarget", ["name", "expires_in", "refresh", "cost"])
+
+
+class DecayingCounter:
+    """Request counter whose scores halve every `half_life` seconds."""
+    def __init__(self, half_life: float = 3600.0, max_keys: int = 10000):
+        self.decay = math.log(2) / half_life
+        self.max_keys = max_keys
+        self._scores = {}  # key -> (score, updated_at)
+        self._lock = threading.Lock()
+
+    def _decayed(self, score, updated_at, now):
+        return score * math.exp(-self.decay * (now - updated_at))
+
+    def hit(self, key, weight: float = 1.0):
+        now = time.monotonic()
+        with self._lock:
+            score, updated_at = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, updated_at, now) + weight, now)
+            if len(self._scores) > self.max_keys:
+                self._prune(now)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._scores
+
+    def top(self, n: int):
+        now = time.monotonic()
+        with self._lock:
+            scored = [(self._decayed(s, t, now), key) for key, (s, t) in self._scores.items()]
+        return [key for _, key in heapq.nlargest(n, scored, key=lambda item: item[0])]
+
+    def _prune(self, now):
+        # Drop the coldest half
+        ranked = sorted(self._scores.items(), key=lambda kv: self._decayed(*kv[1], now))
+        for key, _ in ranked[:len(ranked) // 2]:
+            del self._scores[key]
+
+
+class CacheWarmer:
+    """
+    Keeps provider caches hot for the most requested companies.
+
+    Every run re-fetches the entries of the top `warm_set_size` companies that
+    expire within `lead_time` seconds, doing at most `refresh_budget` refreshes
+    and skipping any refresh whose provider has no rate limit budget left.
+    """
+    def __init__(self, targets, warm_set_size=None, refresh_budget=None,
+                 interval=None, lead_time=None, half_life=None):
+        self.targets = list(targets)
+        self.warm_set_size = warm_set_size or int(os.getenv("WARM_SET_SIZE", 25))
+        self.refresh_budget = refresh_budget or int(os.getenv("WARM_REFRESH_BUDGET", 20))
+        self.interval = interval or int(os.getenv("WARM_INTERVAL_SECONDS", 60))
+        self.lead_time = lead_time or int(os.getenv("WARM_LEAD_SECONDS", 90))
+        self.counter = DecayingCounter(half_life or float(os.getenv("WARM_HALF_LIFE_SECONDS", 3600)))
+        self._tickers = {}  # normalized company name -> (company name, ticker)
+        self._lock = threading.Lock()
+
+    def record(self, company_name: str, ticker: str = None, hit: bool = True):
+        """Count a request for a company, the ticker can be given later once it is resolved."""
+        key = company_name.strip().lower()
+        if hit:
+            self.counter.hit(key)
+        if ticker:
+            with self._lock:
+                self._tickers[key] = (company_name, ticker)
+                if len(self._tickers) > self.counter.max_keys:
+                    # Forget the companies the counter has pruned
+                    self._tickers = {k: v for k, v in self._tickers.items() if k in self.counter}
+
+    def hot(self):
+        with self._lock:
+            tickers = dict(self._tickers)
+        return [tickers[key] for key in self.counter.top(self.warm_set_size) if key in tickers]
+
+    def _has_budget(self, cost):
+        # The refresh itself consumes the tokens as it calls the providers
+        return all(get_limiter(provider).available() >= n for provider, n in cost.items())
+
+    def run(self) -> int:
+        refreshed = 0
+        for company_name, ticker in self.hot():
+            for target in self.targets:
+                if refreshed >= self.refresh_budget:
+                    return refreshed
+                remaining = target.expires_in(company_name, ticker)
+                if remaining is not None and remaining > self.lead_time:
+                    continue
+                if not self._has_budget(target.cost):
+                    continue
+                try:
+                    target.refresh(company_name, ticker)
+                    refreshed += 1
+                except Exception as e:
+                    logger.error(f"Cache warm of {target.name} for {company_name} failed: {e}")
+        return refreshed
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from price_series import PriceSeries
+
+TRADING_DAYS = 252
+
+
+def _to_json(values, decimals=4):
+    # NaN (not enough data, flat prices) becomes null in the response
+    values = np.round(np.asarray(values, dtype=np.float64), decimals)
+    return [None if np.isnan(v) else v for v in values.tolist()]
+
+
+def aligned_prices(series: List[PriceSeries]) -> pd.DataFrame:
+    """Day x ticker price matrix, forward filled and cut to the days every ticker has traded."""
+    frame = pd.concat({s.ticker: pd.Series(s.prices, index=s.days) for s in series}, axis=1)
+    return frame.sort_index().ffill().dropna()
+
+
+def relative_performance(target: PriceSeries, competitors: List[PriceSeries], window: int = 20) -> Optional[Dict]:
+    """
+    Compare a ticker with its competitors over their common dates.
+
+    Everything is computed in one pass over the aligned price matrix, the
+    target is always the first column.
+
+    Args:
+        target (PriceSeries): Price history of the analyzed company
+        competitors (List[PriceSeries]): Price histories of its competitors
+        window (int): Rolling correlation window in trading days
+
+    Returns:
+        Optional[Dict]: Rebased prices (first common day = 100), rolling correlation
+        against the target, and per ticker beta, correlation, annualized volatility
+        and total return. None if there are fewer than 3 common days.
+    """
+    frame = aligned_prices([target] + [c for c in competitors if c.ticker != target.ticker])
+    if len(frame) < 3:
+        return None
+
+    tickers = list(frame.columns)
+    prices = frame.to_numpy(dtype=np.float64)
+    returns = prices[1:] / prices[:-1] - 1.0
+    n = returns.shape[0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rebased = prices / prices[0] * 100.0
+        centered = returns - returns.mean(axis=0)
+        cov_with_target = centered.T @ centered[:, 0] / (n - 1)
+        std = returns.std(axis=0, ddof=1)
+        beta = cov_with_target / cov_with_target[0]
+        correlation = cov_with_target / (std * std[0])
+        volatility = std * np.sqrt(TRADING_DAYS)
+        total_return = prices[-1] / prices[0] - 1.0
+
+        window = min(window, n)
+        returns_frame = pd.DataFrame(returns, columns=tickers)
+        rolling = returns_frame.rolling(window).corr(returns_frame[tickers[0]]).to_numpy()
+
+    labels = np.datetime_as_string(frame.index.to_numpy().astype("datetime64[D]"), unit="D").tolist()
+    return {
+        "ticker": tickers[0],
+        "tickers": tickers,
+        "time_labels": labels,
+        "window": window,
+        "rebased": {t: _to_json(rebased[:, i], 2) for i, t in enumerate(tickers)},
+        # aligned with time_labels[1:], the first window-1 values are null
+        "rolling_correlation": {t: _to_json(rolling[:, i]) for i, t in enumerate(tickers[1:], 1)},
+        "beta": dict(zip(tickers, _to_json(beta))),
+        "correlation": dict(zip(tickers, _to_json(correlation))),
+        "volatility": dict(zip(tickers, _to_json(volatility))),
+        "total_return": dict(zip(tickers, _to_json(total_return))),
+    }
@@ -1,3 +1,6 @@
+import time
+_import_started = time.perf_counter()
+
 from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
 import secrets
@@ -6,29 +9,55 @@ from flask_sqlalchemy import SQLAlchemy
 from database_model import db
 #blueprints
 from auth_route import auth_bp
-from backend import backend
-from news_sentiment import NewsSentimentAnalyzer
+from backend import backend, start_background_jobs
 import os
 
-#app initialization
-app = Flask(__name__, static_folder="static", template_folder="templates") 
-CORS(app)  # Enable CORS for all routes
+_import_seconds = time.perf_counter() - _import_started
+
+#app factory, nothing below runs at import time
+#wsgi servers should load "app:create_app()"
+def create_app(start_background=True, create_tables=True):
+    timings = {"imports": _import_seconds}
+    started = time.perf_counter()
+
+    #app initialization
+    app = Flask(__name__, static_folder="static", template_folder="templates") 
+    CORS(app)  # Enable CORS for all routes
+
+    #configurations
+    app.config['SECRET_KEY'] = secrets.token_hex(32)  # Change this in production!
+    app.config['SESSION_TYPE'] = 'filesystem' #using server side session cookies - filesystem
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///stockmind.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-#configurations
-app.config['SECRET_KEY'] = secrets.token_hex(32)  # Change this in production!
-app.config['SESSION_TYPE'] = 'filesystem' #using server side session cookies - filesystem
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///stockmind.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    Session(app)
+    db.init_app(app)
 
-Session(app)
-db.init_app(app)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(backend)
 
-app.register_blueprint(auth_bp)
-app.register_blueprint(backend)
+    @app.route("/")
+    def home():
+        return render_template("FRONT.html")
 
-@app.route("/")
-def home():
-    return render_template("FRONT.html")
+    timings["app"] = time.perf_counter() - started
+
+    if create_tables:
+        started = time.perf_counter()
+        with app.app_context():
+            db.create_all()
+        timings["create_tables"] = time.perf_counter() - started
+
+    #alert checks and cache warming, keep this off for scripts and one-off commands
+    if start_background:
+        started = time.perf_counter()
+        app.extensions["stockmind_scheduler"] = start_background_jobs(app)
+        timings["scheduler"] = time.perf_counter() - started
+
+    timings["total"] = sum(timings.values())
+    app.config["STARTUP_TIMINGS"] = timings
+    app.logger.info("Startup timings: " + ", ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in timings.items()))
+    return app
 
 # The /news endpoint is now handled by backend.py's /analyze_company route.
 # We are removing this redundant endpoint from app.py.
@@ -45,8 +74,6 @@ def home():
 #     except Exception as e:
 #         return jsonify({'error': str(e)}), 500
 
-with app.app_context():
-    db.create_all()
-
 if __name__=="__main__":
+    app = create_app()
     app.run(debug=True)
\ No newline at end of file
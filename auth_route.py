@@ -1,4 +1,4 @@
-from flask import Flask,Blueprint, render_template, redirect, url_for, request, session
+from flask import Flask,Blueprint, render_template, redirect, url_for, request, session, jsonify
 from database_model import db
 from database_model import User
 import authenticator
@@ -43,12 +43,22 @@ def authenticate():
     username = session['username']
     email = session['email']
     try:
-        otp =  authenticator.generateOTP(username=username, usermail=email)
+        otp, delivery_id = authenticator.generateOTP(username=username, usermail=email)
         session["otp"] = otp
+        session["otp_delivery"] = delivery_id
     except:
         return render_template("access-account.html", error = "Invalid email address")
     return render_template("access-account.html", otp = True)
 
+@auth_bp.route('/api/otp-status')
+def otpStatus():
+    delivery_id = session.get("otp_delivery")
+    status = authenticator.deliveryStatus(delivery_id) if delivery_id else None
+    if status is None:
+        # Statuses live in the worker process that queued the email, another worker can't tell
+        return jsonify(state="unknown"), 404
+    return jsonify(state=status["state"], attempts=status["attempts"], error=status["error"])
+
 @auth_bp.route('/api/verify', methods = ['POST'])
 def verify():
     inp = request.form['userOTP']
@@ -59,6 +69,7 @@ def verify():
     session.pop("password",None)
     session.pop("email",None)
     session.pop("otp",None)
+    session.pop("otp_delivery",None)
     authSuccess = authenticator.verifyOTP(otp, inp)
     if(authSuccess):
         newUser = User(username = username , email = email, password_hash = password)
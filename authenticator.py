@@ -1,19 +1,40 @@
-import smtplib as smt
 import os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import random
+import threading
+from mailer import MailQueue
 
 #website owner will store their gmail application key 
 #in environemnt variable named EMPS and 
 #gmail address in env var named owner_email
-def generateOTP(username, usermail):
-    smpt_server = 'smtp.gmail.com'
-    smtp_port = 587
-    #change this
-    provider = os.getenv("<enter your environment variable storing the email address>")
+#SMTP_HOST/SMTP_PORT/SMTP_STARTTLS can point delivery at a local SMTP server for testing
+def _provider():
     #change this
-    emps = os.getenv('<enter the env variable storing the gmail app pasword>')
+    return os.getenv("<enter your environment variable storing the email address>")
+
+_mail_queue = None
+_mail_queue_lock = threading.Lock()
+
+def getMailQueue():
+    global _mail_queue
+    #lock so concurrent first sign-ups share one queue
+    with _mail_queue_lock:
+        if _mail_queue is None:
+            #change this
+            emps = os.getenv('<enter the env variable storing the gmail app pasword>')
+            _mail_queue = MailQueue(
+                host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+                port=int(os.getenv("SMTP_PORT", 587)),
+                username=_provider(),
+                password=emps,
+                use_tls=os.getenv("SMTP_STARTTLS", "1") != "0",
+            )
+        return _mail_queue
+
+#returns the otp and a delivery id, the email itself is sent in the background
+def generateOTP(username, usermail):
+    provider = _provider()
     msg = MIMEMultipart()
     otp = random.randint(100000,999999)
     btn = f"""
@@ -83,14 +104,11 @@ def generateOTP(username, usermail):
     msg['X-Mailer'] = 'Python-Mail'
     msg.attach(MIMEText(btn, 'html'))
 
-    s = smt.SMTP(smpt_server,smtp_port)
-    try:
-        s.starttls()
-        s.login(provider,emps)
-        s.sendmail(provider, usermail, msg.as_string())
-    finally:    
-        s.quit()
-    return otp
+    delivery_id = getMailQueue().submit(provider, usermail, msg.as_string())
+    return otp, delivery_id
+
+def deliveryStatus(delivery_id):
+    return getMailQueue().status(delivery_id)
 
 def verifyOTP(otp,inp):
     otp = str(otp)
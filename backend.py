@@ -1,14 +1,29 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, session, Blueprint
+from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, session, Blueprint, current_app, Response, stream_with_context
 from functools import wraps
 import requests 
-import yfinance as yf 
-import wikipedia 
-from google import genai 
 from dotenv import load_dotenv 
 import os
-from alert_system.scheduler import start_scheduler, alerts
-from utils import login_required
+import json
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from alert_system.scheduler import start_scheduler, with_app_context, alerts, alert_queue
+from alert_system.warmer import CacheWarmer, WarmTarget
+from utils import login_required, admin_required, is_admin_request
 from news_sentiment import NewsSentimentAnalyzer
+from cache import TTLCache, ResponseCache
+from rate_limit import get_limiter
+from price_series import PriceSeries
+from market_data import get_market_provider, is_synthetic
+from quote_hub import get_quote_hub
+import competitor_discovery
+import market_snapshot
+import competitor_graph
+from database_model import db
+from profiler import get_profiler
+# wikipedia, google.genai, pandas (analytics, synthetic_market) and yfinance are
+# imported on first use so importing this module stays cheap
 # Load environment variables from .env file
 load_dotenv()
 
@@ -60,11 +75,57 @@ TICKER_CACHE = {
     "verizon": "VZ",
     "at&t": "T"
 }
-try:
-    client = genai.Client(api_key=GEMINI_API_KEY)
-except Exception as e:
-    print(f"Error initializing Gemini client: {e}")
-    # We'll handle this in the query_gemini_llm function
+
+# Provider response caches, TTLs in seconds
+PRICE_CACHE = TTLCache(ttl=int(os.getenv("PRICE_CACHE_TTL", 300)))              # (ticker, time_range) -> PriceSeries
+MARKET_CAP_CACHE = TTLCache(ttl=int(os.getenv("MARKET_CAP_CACHE_TTL", 3600)))   # ticker -> market cap
+COMPETITOR_CACHE = TTLCache(ttl=int(os.getenv("COMPETITOR_CACHE_TTL", 3600)))   # company -> (sectors, top competitors)
+NEWS_CACHE = TTLCache(ttl=int(os.getenv("NEWS_CACHE_TTL", 900)))                # news_cache_key() -> (articles, summary, competitor sentiment)
+ANALYTICS_CACHE = TTLCache(ttl=int(os.getenv("PRICE_CACHE_TTL", 300)))          # (ticker, competitor tickers, time_range) -> dict
+BACKTEST_CACHE = TTLCache(ttl=int(os.getenv("BACKTEST_CACHE_TTL", 6 * 3600)))   # (ticker, period) -> PriceSeries of daily closes
+# normalized name -> verified ticker from stored discoveries and the competitor graph. Kept apart
+# from TICKER_CACHE so it stays bounded and is only matched exactly, never by substring
+LOCAL_TICKER_CACHE = TTLCache(ttl=int(os.getenv("LOCAL_TICKER_CACHE_TTL", 24 * 3600)),
+                              maxsize=int(os.getenv("LOCAL_TICKER_CACHE_SIZE", 5000)))
+
+FALLBACK_CACHE_TTL = int(os.getenv("FALLBACK_CACHE_TTL", 30))  # mock prices / fallback competitors after a provider failure
+
+# Rendered /analyze_company responses, keyed by (normalized company name, time_range)
+RESPONSE_CACHE = ResponseCache(
+    ttl=int(os.getenv("RESPONSE_CACHE_TTL", 120)),
+    stale_ttl=int(os.getenv("RESPONSE_CACHE_STALE_TTL", 900)),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_MB", 64)) * 1024 * 1024,
+)
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 25))  # companies per /analyze_companies call
+MAX_STREAM_TICKERS = 20  # tickers per /quotes/stream connection
+MAX_BACKTEST_ALERTS = 100  # candidate alerts per /alerts/backtest call
+BACKTEST_PERIODS = ("1y", "2y", "5y", "10y", "max")
+
+_gemini_client = None
+_fallback_market = None
+_lazy_lock = threading.Lock()
+
+def get_gemini_client():
+    # Created on first use, None if it can't be initialized (e.g. invalid API key)
+    global _gemini_client
+    with _lazy_lock:
+        if _gemini_client is None:
+            try:
+                from google import genai
+                _gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+            except Exception as e:
+                print(f"Error initializing Gemini client: {e}")
+                _gemini_client = False  # don't retry on every request
+    return _gemini_client or None
+
+def get_fallback_market():
+    global _fallback_market
+    with _lazy_lock:
+        if _fallback_market is None:
+            from synthetic_market import SyntheticMarket
+            _fallback_market = SyntheticMarket(seed=int(os.getenv("SYNTHETIC_SEED", 0)))
+    return _fallback_market
 
 #initialize blueprint
 backend = Blueprint('backend', __name__, url_prefix='/service')
@@ -88,12 +149,82 @@ def create_alert():
     flash(f"Alert created for {data.get('ticker')}", "success")
     return redirect('/')
 
-start_scheduler()
+def alert_level(alert):
+    # Target of a price alert or threshold of an RSI alert, None if missing (the form posts '')
+    value = alert.get('target' if alert['type'] == "price" else 'threshold')
+    return None if value is None or str(value).strip() == "" else value
+
+@backend.route('/alerts/backtest', methods=['POST'])
+@login_required
+def backtest_alert():
+    # How often candidate alerts would have fired over the ticker's daily history, used by alert_form.html
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify(success=False, error="Expected a JSON object."), 400
+    ticker = str(payload.get("ticker", "")).strip().upper()
+    period = payload.get("period", "5y")
+    candidates = payload.get("alerts", [])
+
+    if not ticker:
+        return jsonify(success=False, error="No ticker provided."), 400
+    if period not in BACKTEST_PERIODS:
+        return jsonify(success=False, error=f"Period must be one of {', '.join(BACKTEST_PERIODS)}."), 400
+    if not isinstance(candidates, list) or not 0 < len(candidates) <= MAX_BACKTEST_ALERTS:
+        return jsonify(success=False, error=f"Between 1 and {MAX_BACKTEST_ALERTS} alerts can be backtested at once."), 400
+    if not all(isinstance(alert, dict) for alert in candidates):
+        return jsonify(success=False, error="Alerts must be JSON objects."), 400
+    if any(a.get('type') not in ("price", "rsi") or a.get('direction') not in ("above", "below") for a in candidates):
+        return jsonify(success=False, error="Alerts need a type of price or rsi and a direction of above or below."), 400
+    if any(alert_level(a) is None for a in candidates):
+        return jsonify(success=False, error="Price alerts need a target and RSI alerts a threshold."), 400
+    try:
+        candidates = [
+            {
+                'type': alert['type'],
+                'target': float(alert_level(alert)) if alert['type'] == "price" else 0.0,
+                'threshold': float(alert_level(alert)) if alert['type'] == "rsi" else 30.0,
+                'direction': alert['direction'],
+            }
+            for alert in candidates
+        ]
+    except (TypeError, ValueError) as e:
+        return jsonify(success=False, error=f"Invalid alert: {e}"), 400
+
+    try:
+        key = (ticker, period)
+        series = BACKTEST_CACHE.get(key)
+        if series is None:
+            get_limiter("yfinance").consume()
+            # No mock fallback here, a backtest on made up prices would be misleading
+            history = get_market_provider().history(ticker, period)
+            if history.empty:
+                return jsonify(success=False, error=f"No price history found for {ticker}."), 404
+            series = PriceSeries.from_history(history, ticker=ticker)
+            BACKTEST_CACHE.set(key, series)
+
+        from backtest import backtest_alerts
+        results = backtest_alerts(series, candidates)
+        labels = series.time_labels()
+        return jsonify(
+            success=True,
+            ticker=ticker,
+            period=period,
+            bars=len(series),
+            start=labels[0] if labels else None,
+            end=labels[-1] if labels else None,
+            results=results,
+        )
+    except Exception as e:
+        print(f"Error backtesting alerts for {ticker}: {e}")
+        return jsonify(success=False, error=f"An unexpected server error occurred: {str(e)}"), 500
 
 #helper functions 
 
 def fetch_wikipedia_summary(company_name): 
+    if is_synthetic():
+        return company_name, get_market_provider().summary(company_name)
     try: 
+        import wikipedia
         search_results = wikipedia.search(company_name) 
         if search_results: 
             page_title = search_results[0] 
@@ -104,63 +235,101 @@ def fetch_wikipedia_summary(company_name):
         return None, "No Wikipedia page found for the given company or an error occurred."
     return None, "No Wikipedia page found for the given company." 
  
-def fetch_stock_price(ticker, time_range="3mo"): 
+def mock_stock_price(ticker, time_range="3mo"):
+    # Deterministic stand-in when the provider has no data, same generator as MARKET_PROVIDER=synthetic
+    return get_fallback_market().series(ticker, time_range)
+
+def fetch_stock_price(ticker, time_range="3mo"):
+    # None when the provider has no data or fails, get_cached_stock_price stands in mock prices
     try: 
-        # Set a timeout for the request
-        stock = yf.Ticker(ticker)
         # Use the provided time range
-        history = stock.history(period=time_range)
+        history = get_market_provider().history(ticker, time_range)
         
         if history.empty:
             print(f"No stock price data found for {ticker}")
-            # Generate mock data for testing
-            import datetime
-            import random
-            today = datetime.datetime.now()
-            
-            # Adjust the number of days based on time range
-            days = {
-                "1wk": 7,
-                "1mo": 30,
-                "3mo": 90
-            }.get(time_range, 90)
+            return None
             
-            time_labels = [(today - datetime.timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days, 0, -1)]
-            base_price = 100.0
-            stock_prices = [round(base_price + random.uniform(-10, 10), 2) for _ in range(days)]
-            return stock_prices, time_labels
-            
-        time_labels = history.index.strftime('%Y-%m-%d').tolist() 
-        stock_prices = [round(price, 2) for price in history['Close'].tolist()]  # Round prices to 2 decimal places
-        return stock_prices, time_labels 
+        return PriceSeries.from_history(history, ticker=ticker)
     except Exception as e: 
         print(f"Error fetching stock price for {ticker}: {e}")
-        # Generate mock data for testing
-        import datetime
-        import random
-        today = datetime.datetime.now()
-        
-        # Adjust the number of days based on time range
-        days = {
-            "1wk": 7,
-            "1mo": 30,
-            "3mo": 90
-        }.get(time_range, 90)
-        
-        time_labels = [(today - datetime.timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days, 0, -1)]
-        base_price = 100.0
-        stock_prices = [round(base_price + random.uniform(-10, 10), 2) for _ in range(days)]
-        return stock_prices, time_labels
+        return None
 
-def get_ticker_from_alpha_vantage(company_name): 
-    # Check if company is in our cache first
-    company_lower = company_name.lower()
+def get_cached_stock_price(ticker, time_range="3mo", refresh=False):
+    key = (ticker, time_range)
+    cached = None if refresh else PRICE_CACHE.get(key)
+    if cached is None:
+        get_limiter("yfinance").consume()
+        cached = fetch_stock_price(ticker, time_range)
+        if cached is not None:
+            PRICE_CACHE.set(key, cached)
+        else:
+            # Mock prices only stand in briefly so the next request retries the provider
+            cached = mock_stock_price(ticker, time_range)
+            PRICE_CACHE.set(key, cached, ttl=FALLBACK_CACHE_TTL)
+    return cached
+
+def fetch_stock_prices_batch(tickers, time_range="3mo"):
+    # Price histories for many tickers, every uncached one comes from a single download call
+    results = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        cached = PRICE_CACHE.get((ticker, time_range))
+        if cached is None:
+            missing.append(ticker)
+        else:
+            results[ticker] = cached
+
+    if missing:
+        get_limiter("yfinance").consume()
+        try:
+            history = get_market_provider().download(missing, time_range)
+            closes = history["Close"]
+            if not hasattr(closes, "columns"):  # a single ticker can come back as a Series
+                closes = closes.to_frame(missing[0])
+            for ticker, series in PriceSeries.from_frame(closes[[t for t in missing if t in closes.columns]]).items():
+                results[ticker] = series
+                PRICE_CACHE.set((ticker, time_range), series)
+        except Exception as e:
+            print(f"Error in batch price download for {missing}: {e}")
+
+    # Whatever the batch download missed goes through the single ticker path and its fallback
+    for ticker in missing:
+        if ticker not in results:
+            results[ticker] = get_cached_stock_price(ticker, time_range)
+    return results
+
+def lookup_cached_ticker(company_name):
+    # Exact name first, then any cached name contained in it ("apple inc" -> apple)
+    company_lower = company_name.lower().strip()
+    if company_lower in TICKER_CACHE:
+        return TICKER_CACHE[company_lower]
     for key, ticker in TICKER_CACHE.items():
         if key in company_lower:
-            print(f"Using cached ticker {ticker} for {company_name}")
             return ticker
+    return None
+
+def lookup_exact_ticker(company_name):
+    # Verified tickers only: the whole normalized name has to match, no substring guesses
+    key = competitor_graph.normalize_name(company_name)
+    return TICKER_CACHE.get(key) or LOCAL_TICKER_CACHE.get(key)
+
+def lookup_known_ticker(company_name):
+    # Curated / Alpha Vantage names, then names seen in stored discoveries or the competitor graph
+    return lookup_cached_ticker(company_name) or LOCAL_TICKER_CACHE.get(competitor_graph.normalize_name(company_name))
+
+def get_ticker_from_alpha_vantage(company_name): 
+    # Check if company is in our cache first
+    company_lower = company_name.lower()
+    ticker = lookup_known_ticker(company_name)
+    if ticker:
+        print(f"Using cached ticker {ticker} for {company_name}")
+        return ticker
     
+    if is_synthetic():
+        return get_market_provider().resolve_ticker(company_name)
+
     # If not in cache, try API with a short timeout
+    get_limiter("alpha_vantage").consume()
     try: 
         url = "https://www.alphavantage.co/query" 
         params = { 
@@ -208,43 +377,33 @@ def get_ticker_from_alpha_vantage(company_name):
         return company_name.split()[0].upper() if company_name else "MSFT" # More robust fallback
  
 def fetch_market_cap(ticker): 
+    market_cap = MARKET_CAP_CACHE.get(ticker)
+    if market_cap is not None:
+        return market_cap
+    get_limiter("yfinance").consume()
     try: 
-        stock = yf.Ticker(ticker) 
-        market_cap = stock.info.get('marketCap', None) 
+        market_cap = get_market_provider().market_cap(ticker) 
+        if market_cap:
+            MARKET_CAP_CACHE.set(ticker, market_cap)
         return market_cap 
     except Exception as e: 
         return None 
  
+def get_market_caps(tickers):
+    # Snapshot table first, tickers it doesn't know yet fall back to a live lookup
+    # and are queued for the next bulk refresh
+    tickers = list(set(tickers))
+    market_caps = market_snapshot.market_caps(tickers)
+    missing = [ticker for ticker in tickers if ticker not in market_caps]
+    if missing:
+        market_snapshot.track(missing)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            market_caps.update({t: cap for t, cap in zip(missing, pool.map(fetch_market_cap, missing)) if cap})
+    return market_caps
+
 def get_stock_price_for_competitor(ticker): 
-    try: 
-        stock = yf.Ticker(ticker) 
-        # Use a longer period (3mo instead of 1mo) for more detailed response
-        history = stock.history(period="3mo") 
-        
-        if history.empty:
-            print(f"No stock price data found for competitor {ticker}")
-            # Generate mock data for testing
-            import datetime
-            import random
-            today = datetime.datetime.now()
-            time_labels = [(today - datetime.timedelta(days=i)).strftime('%Y-%m-%d') for i in range(90, 0, -1)]
-            base_price = 100.0
-            stock_prices = [round(base_price + random.uniform(-10, 10), 2) for _ in range(90)]
-            return stock_prices, time_labels
-            
-        time_labels = history.index.strftime('%Y-%m-%d').tolist() 
-        stock_prices = [round(price, 2) for price in history['Close'].tolist()]  # Round prices to 2 decimal places
-        return stock_prices, time_labels 
-    except Exception as e: 
-        print(f"Error fetching stock price for competitor {ticker}: {e}")
-        # Generate mock data for testing
-        import datetime
-        import random
-        today = datetime.datetime.now()
-        time_labels = [(today - datetime.timedelta(days=i)).strftime('%Y-%m-%d') for i in range(90, 0, -1)]
-        base_price = 100.0
-        stock_prices = [round(base_price + random.uniform(-10, 10), 2) for _ in range(90)]
-        return stock_prices, time_labels
+    # Same 3 month window as the main chart, so both share the price cache
+    return get_cached_stock_price(ticker, "3mo")
  
 def get_top_competitors(competitors): 
     competitor_data = [] 
@@ -256,67 +415,157 @@ def get_top_competitors(competitors):
     # Use the provided competitors or fallback if empty
     competitors_to_process = set(competitors) if competitors else fallback_competitors
  
+    tickers = {}
     for competitor in competitors_to_process:  # Remove duplicate names 
         ticker = get_ticker_from_alpha_vantage(competitor) 
         if ticker and ticker not in processed_tickers: 
-            market_cap = fetch_market_cap(ticker) 
-            stock_prices, time_labels = get_stock_price_for_competitor(ticker) 
-            if market_cap and stock_prices and time_labels: 
-                competitor_data.append({ 
-                    "name": competitor, 
-                    "ticker": ticker, 
-                    "market_cap": market_cap, 
-                    "stock_prices": stock_prices, 
-                    "time_labels": time_labels, 
-                    "stock_price": stock_prices[-1], 
-                }) 
-                processed_tickers.add(ticker)  # Add ticker to the processed set 
+            tickers[competitor] = ticker
+            processed_tickers.add(ticker)  # Add ticker to the processed set 
+
+    # Rank on snapshot market caps, price histories are only fetched for the top 3
+    market_caps = get_market_caps(tickers.values())
+    ranked = sorted(
+        ((name, ticker, market_caps[ticker]) for name, ticker in tickers.items() if market_caps.get(ticker)),
+        key=lambda c: c[2], reverse=True,
+    )
+    for competitor, ticker, market_cap in ranked:
+        if len(competitor_data) == 3:
+            break
+        series = get_stock_price_for_competitor(ticker) 
+        if len(series): 
+            competitor_data.append({ 
+                "name": competitor, 
+                "ticker": ticker, 
+                "market_cap": market_cap, 
+                "series": series, 
+            }) 
     
     # If we couldn't get any valid competitor data, use fallback data
     if not competitor_data:
         print("No valid competitor data found, using fallback data")
         # Create some fallback data with mock values
-        import random
-        for i, comp in enumerate(fallback_competitors):
+        for comp in fallback_competitors:
             ticker = comp[0:3].upper()  # Just use first 3 letters as ticker
-            mock_market_cap = 1000000000 * (3-i)  # Decreasing market caps
-            # Add random walk for mock prices to avoid straight lines
-            mock_prices = []
-            price = 100 + i*10
-            for j in range(30):
-                price += random.uniform(-2, 2)
-                mock_prices.append(round(price, 2))
-            mock_dates = [f"2025-04-{j+1:02d}" for j in range(30)]  # Mock dates
-            
             competitor_data.append({
                 "name": comp,
                 "ticker": ticker,
-                "market_cap": mock_market_cap,
-                "stock_prices": mock_prices,
-                "time_labels": mock_dates,
-                "stock_price": mock_prices[-1],
+                "market_cap": get_fallback_market().market_cap(ticker),
+                "series": mock_stock_price(ticker),
+                "fallback": True,
             })
  
     # Sort competitors by market cap and return the top 3 
     top_competitors = sorted(competitor_data, key=lambda x: x["market_cap"], reverse=True)[:3] 
     return top_competitors 
+
+def get_competitor_analytics(ticker, series, top_competitors, time_range="3mo"):
+    # Rebased returns, rolling correlation, beta and volatility against the top competitors
+    key = (ticker, tuple(sorted(comp["ticker"] for comp in top_competitors)), time_range)
+    cached = ANALYTICS_CACHE.get(key)
+    if cached is None:
+        from analytics import relative_performance
+        cached = relative_performance(series, [comp["series"] for comp in top_competitors])
+        ANALYTICS_CACHE.set(key, cached)
+    return cached
+
+def competitors_to_json(top_competitors):
+    # Price series stay as arrays in the caches and only become lists here
+    result = []
+    for comp in top_competitors:
+        stock_prices, time_labels = comp["series"].to_json()
+        result.append({
+            "name": comp["name"],
+            "ticker": comp["ticker"],
+            "market_cap": comp["market_cap"],
+            "stock_prices": stock_prices,
+            "time_labels": time_labels,
+            "stock_price": comp["series"].last,
+        })
+    return result
  
-def query_gemini_llm(company_name): 
+def select_top_competitors_batch(competitors_by_company):
+    # Resolves and ranks the competitors of many companies at once, every shared
+    # name and ticker is looked up only once for the whole batch.
+    # Returns company -> [(name, ticker, market_cap)] for the top 3 by market cap
+    names = {name for competitors in competitors_by_company.values() for name in competitors}
+    tickers = {name: get_ticker_from_alpha_vantage(name) for name in names}
+    unique_tickers = list({ticker for ticker in tickers.values() if ticker})
+    market_caps = get_market_caps(unique_tickers)
+
+    selected = {}
+    for company, competitors in competitors_by_company.items():
+        candidates = {}
+        for name in competitors:
+            ticker = tickers.get(name)
+            if ticker and market_caps.get(ticker) and ticker not in candidates:
+                candidates[ticker] = (name, ticker, market_caps[ticker])
+        selected[company] = sorted(candidates.values(), key=lambda c: c[2], reverse=True)[:3]
+    return selected
+
+# Shown when Gemini can't be reached, never stored in the competitor graph
+FALLBACK_COMPETITORS = [
+    {
+        "name": "Technology Sector:",
+        "competitors": ["Microsoft", "Apple", "IBM", "Oracle"]
+    },
+    {
+        "name": "Financial Sector:",
+        "competitors": ["JPMorgan Chase", "Bank of America", "Wells Fargo", "Citigroup"]
+    }
+]
+
+def local_competitors(company_name):
+    # Stored discoveries first, then the competitor graph, None if neither knows the company
+    if is_synthetic():
+        return None
+    found = competitor_discovery.lookup(company_name) or competitor_graph.lookup(company_name, lookup_known_ticker(company_name))
+    if not found:
+        return None
+    sectors, tickers = found
+    for name, ticker in tickers.items():
+        LOCAL_TICKER_CACHE.set(competitor_graph.normalize_name(name), ticker)
+    return sectors
+
+def find_competitors(company_name):
+    # Returns (sectors, True if Gemini was asked), only a Gemini call uses up rate limit
+    sectors = local_competitors(company_name)
+    if sectors:
+        return sectors, False
+    get_limiter("gemini").consume()
+    return query_gemini_llm(company_name, use_local=False), True
+
+def remember_competitors(company_name, sectors):
+    # Fresh Gemini answers go into the competitor graph. Call it after the competitors'
+    # tickers were resolved, only names with a verified ticker (exact match, no substring
+    # guesses) become edges
+    if is_synthetic() or sectors is FALLBACK_COMPETITORS or not sectors:
+        return
+    ticker = lookup_exact_ticker(company_name)
+    if not ticker:
+        return
+    names = [name for sector in sectors for name in sector["competitors"]]
+    tickers = {name: lookup_exact_ticker(name) for name in names}
+    try:
+        competitor_graph.record(company_name, ticker, sectors, {name: t for name, t in tickers.items() if t})
+    except Exception as e:
+        print(f"Error storing competitor graph for {company_name}: {e}")
+        db.session.rollback()
+
+def query_gemini_llm(company_name, use_local=True): 
+    if is_synthetic():
+        return get_market_provider().competitors(company_name)
+    # Companies covered by a competitor_discovery.py run or already in the competitor graph don't need a Gemini call
+    if use_local:
+        sectors = local_competitors(company_name)
+        if sectors:
+            return sectors
     try: 
-        # Check if client is defined (it might not be if API key is invalid)
-        if 'client' not in globals():
+        # Client might not be available if API key is invalid
+        client = get_gemini_client()
+        if client is None:
             print("Gemini client not initialized, using fallback data")
             # Return fallback data
-            return [
-                {
-                    "name": "Technology Sector:",
-                    "competitors": ["Microsoft", "Apple", "IBM", "Oracle"]
-                },
-                {
-                    "name": "Financial Sector:",
-                    "competitors": ["JPMorgan Chase", "Bank of America", "Wells Fargo", "Citigroup"]
-                }
-            ]
+            return FALLBACK_COMPETITORS
             
         prompt = f""" 
         Based on the company name "{company_name}", provide a structured list of sectors and their main competitors.
@@ -339,16 +588,7 @@ def query_gemini_llm(company_name):
         except Exception as api_error:
             print(f"Error calling Gemini API: {api_error}")
             # Return fallback data
-            return [
-                {
-                    "name": "Technology Sector:",
-                    "competitors": ["Microsoft", "Apple", "IBM", "Oracle"]
-                },
-                {
-                    "name": "Financial Sector:",
-                    "competitors": ["JPMorgan Chase", "Bank of America", "Wells Fargo", "Citigroup"]
-                }
-            ]
+            return FALLBACK_COMPETITORS
             
         sectors = [] 
         for line in content.split("\n\n"): 
@@ -361,17 +601,179 @@ def query_gemini_llm(company_name):
     except Exception as e: 
         print(f"Error in query_gemini_llm: {e}")
         # Return fallback data
-        return [
-            {
-                "name": "Technology Sector:",
-                "competitors": ["Microsoft", "Apple", "IBM", "Oracle"]
-            },
-            {
-                "name": "Financial Sector:",
-                "competitors": ["JPMorgan Chase", "Bank of America", "Wells Fargo", "Citigroup"]
-            }
-        ]
+        return FALLBACK_COMPETITORS
  
+def competitor_cache_ttl(competitors, top_competitors):
+    # Fallback data after a Gemini or provider failure is only kept briefly
+    if competitors is FALLBACK_COMPETITORS or any(comp.get("fallback") for comp in top_competitors):
+        return FALLBACK_CACHE_TTL
+    return None
+
+def get_cached_competitors(company_name, refresh=False):
+    key = company_name.strip().lower()
+    cached = None if refresh else COMPETITOR_CACHE.get(key)
+    if cached is None:
+        competitors, asked_gemini = find_competitors(company_name)
+        if not competitors:
+            competitors = [{"name": "No Sectors", "competitors": ["No competitors found."]}]
+        all_competitors = [comp for sector in competitors for comp in sector["competitors"]]
+        cached = (competitors, get_top_competitors(all_competitors))
+        if asked_gemini:
+            remember_competitors(company_name, competitors)
+        COMPETITOR_CACHE.set(key, cached, ttl=competitor_cache_ttl(*cached))
+    return cached
+
+def cached_competitor_tickers(company_name):
+    # Tickers of the company's top competitors if already known, never triggers a lookup
+    cached = COMPETITOR_CACHE.get(company_name.strip().lower())
+    return tuple(sorted(comp["ticker"] for comp in cached[1])) if cached else ()
+
+def news_cache_key(company_name, ticker):
+    return (company_name.strip().lower(), ticker, cached_competitor_tickers(company_name))
+
+def build_news(company_name, ticker, news_analyzer=None, newsapi_articles=None):
+    # (articles, summary, competitor ticker -> sentiment summary), newsapi_articles skips the NewsAPI call
+    competitor_tickers = [t for t in cached_competitor_tickers(company_name) if t != ticker]
+    news_analyzer = news_analyzer or NewsSentimentAnalyzer()
+    if is_synthetic():
+        market = get_market_provider()
+        news_articles = news_analyzer.score_articles(market.news(ticker))
+        competitor_sentiment = {
+            t: news_analyzer.get_sentiment_summary(news_analyzer.score_articles(market.news(t)))
+            for t in competitor_tickers
+        }
+    else:
+        if newsapi_articles is None:
+            get_limiter("newsapi").consume()
+        get_limiter("alpha_vantage").consume()
+        # One Alpha Vantage call covers the company and all of its competitors
+        by_ticker = news_analyzer.fetch_news_alpha_vantage_multi([ticker] + competitor_tickers)
+        news_articles = news_analyzer.get_company_news(
+            company_name, ticker, alpha_vantage_articles=by_ticker.get(ticker.upper(), []),
+            newsapi_articles=newsapi_articles,
+        )
+        competitor_sentiment = {
+            t: news_analyzer.get_sentiment_summary(by_ticker.get(t.upper(), []))
+            for t in competitor_tickers
+        }
+    return news_articles, news_analyzer.get_sentiment_summary(news_articles), competitor_sentiment
+
+def get_cached_news(company_name, ticker, refresh=False):
+    # Returns (articles, summary, competitor ticker -> sentiment summary)
+    key = news_cache_key(company_name, ticker)
+    cached = None if refresh else NEWS_CACHE.get(key)
+    if cached is None:
+        cached = build_news(company_name, ticker)
+        NEWS_CACHE.set(key, cached)
+    return cached
+
+def get_cached_news_batch(tickers):
+    # get_cached_news for {company: ticker}. The companies missing from NEWS_CACHE share one
+    # NewsAPI OR query scored in one pass, Alpha Vantage only filters on all of its tickers at
+    # once, so that is still one call per company (each covering its competitors too)
+    news = {}
+    missing = {}
+    for company, ticker in tickers.items():
+        cached = NEWS_CACHE.get(news_cache_key(company, ticker))
+        if cached is None:
+            missing[company] = ticker
+        else:
+            news[company] = cached
+    if not missing:
+        return news
+
+    news_analyzer = NewsSentimentAnalyzer()
+    newsapi = {}
+    if not is_synthetic():
+        get_limiter("newsapi").consume()
+        newsapi = news_analyzer.fetch_news_newsapi_multi(list(missing))
+
+    def build(company):
+        return build_news(company, missing[company], news_analyzer, newsapi.get(company, []))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for company, built in zip(missing, pool.map(build, missing)):
+            NEWS_CACHE.set(news_cache_key(company, missing[company]), built)
+            news[company] = built
+    return news
+
+# Background refresh of the most requested companies, see alert_system.warmer
+cache_warmer = CacheWarmer([
+    WarmTarget(
+        "price",
+        lambda company, ticker: PRICE_CACHE.expires_in((ticker, "3mo")),
+        lambda company, ticker: get_cached_stock_price(ticker, "3mo", refresh=True),
+        {"yfinance": 1},
+    ),
+    WarmTarget(
+        "competitors",
+        lambda company, ticker: COMPETITOR_CACHE.expires_in(company.strip().lower()),
+        lambda company, ticker: get_cached_competitors(company, refresh=True),
+        {"gemini": 1, "yfinance": 3},
+    ),
+    WarmTarget(
+        "news",
+        lambda company, ticker: NEWS_CACHE.expires_in(news_cache_key(company, ticker)),
+        lambda company, ticker: get_cached_news(company, ticker, refresh=True),
+        {"newsapi": 1, "alpha_vantage": 1},
+    ),
+])
+
+def start_background_jobs(app=None):
+    # Called from the app factory, importing this module doesn't start any threads
+    scheduler = start_scheduler(warmer=cache_warmer, app=app)
+    scheduler.add_job(
+        with_app_context(app, market_snapshot.refresh_snapshots), 'interval',
+        seconds=market_snapshot.SNAPSHOT_INTERVAL, max_instances=1, coalesce=True,
+        next_run_time=datetime.now() + timedelta(seconds=30),
+    )
+    return scheduler
+
+def response_cache_key(company_name, time_range):
+    return (" ".join(company_name.lower().split()), time_range)
+
+def build_company_analysis(company_name, time_range="3mo"):
+    _, summary = fetch_wikipedia_summary(company_name)
+    if not summary:
+        summary = "No description found for this company." # Provide a fallback summary
+
+    ticker = get_ticker_from_alpha_vantage(company_name)
+    if not ticker:  
+        # This case should ideally not be reached with the improved get_ticker_from_alpha_vantage
+        ticker = company_name.split()[0].upper() if company_name else "AAPL" # Absolute fallback
+
+    cache_warmer.record(company_name, ticker, hit=False)
+
+    # Mock prices (cached briefly) when the provider has no data, see get_cached_stock_price
+    series = get_cached_stock_price(ticker, time_range)
+
+    competitor_analytics = None
+    if time_range == "3mo": # Only fetch competitors on initial analysis
+        competitors, top_competitors = get_cached_competitors(company_name)
+        competitor_analytics = get_competitor_analytics(ticker, series, top_competitors, time_range)
+    else:
+        competitors = [{"name": "No Sectors", "competitors": ["No competitors found."]}]
+        all_competitors = [comp for sector in competitors for comp in sector["competitors"]]
+        top_competitors = get_top_competitors(all_competitors)
+    
+    # Fetch news articles with sentiment
+    news_articles, sentiment_summary, competitor_sentiment = get_cached_news(company_name, ticker)
+
+    stock_prices, time_labels = series.to_json()
+
+    return dict(
+        success=True,
+        description=summary,
+        ticker=ticker,
+        stock_prices=stock_prices,
+        time_labels=time_labels,
+        competitors=competitors,
+        top_competitors=competitors_to_json(top_competitors),
+        competitor_analytics=competitor_analytics,
+        news_articles=news_articles,  # Add news articles to the response
+        news_summary=sentiment_summary, # Add news summary to the response
+        competitor_sentiment=competitor_sentiment
+    )
 
 @backend.route("/analyze_company", methods=["GET"])
 @login_required
@@ -382,48 +784,237 @@ def analyze_company():
     if not company_name:
         return jsonify(success=False, error="No company name provided.")
 
+    cache_warmer.record(company_name)
+    app = current_app._get_current_object()
+
+    def build():
+        # Background refreshes run outside the request, keep the db reachable
+        with app.app_context():
+            return json.dumps(build_company_analysis(company_name, time_range)).encode()
+
+    # Sampled by PROFILE_SAMPLE_RATE, admins can force it with the X-Profile header
+    forced = "X-Profile" in request.headers and is_admin_request()
     try:
-        _, summary = fetch_wikipedia_summary(company_name)
-        if not summary:
-            summary = "No description found for this company." # Provide a fallback summary
+        with get_profiler().maybe_trace("analyze_company", f"{company_name} {time_range}", forced) as trace:
+            if forced:
+                # A cache hit would leave the trace empty, profile the analysis itself. Sampled
+                # traces keep using the cache so they show what production requests do
+                body, cache_state = build(), "BYPASS"
+            else:
+                # Served from RESPONSE_CACHE, stale copies are refreshed in the background
+                body, cache_state = RESPONSE_CACHE.get_or_build(response_cache_key(company_name, time_range), build)
+        response = current_app.response_class(body, mimetype="application/json")
+        response.headers["X-Cache"] = cache_state
+        if trace is not None:
+            response.headers["X-Profile-Id"] = trace.id
+        return response
+    except Exception as e:
+        print(f"Unhandled error in analyze_company for {company_name}: {e}")
+        return jsonify(success=False, error=f"An unexpected server error occurred: {str(e)}"), 500
 
-        ticker = get_ticker_from_alpha_vantage(company_name)
-        if not ticker:  
-            # This case should ideally not be reached with the improved get_ticker_from_alpha_vantage
-            ticker = company_name.split()[0].upper() if company_name else "AAPL" # Absolute fallback
+@backend.route("/competitors/graph", methods=["GET"])
+@login_required
+def competitor_graph_neighbors():
+    # Stored competitors of a ticker, hops=2 adds competitors of competitors
+    ticker = request.args.get("ticker", "").strip().upper()
+    if not ticker:
+        return jsonify(success=False, error="No ticker provided."), 400
+    hop1 = competitor_graph.neighbors(ticker)
+    result = dict(
+        success=True,
+        ticker=ticker,
+        neighbors=[n._asdict() for n in hop1],
+    )
+    if request.args.get("hops", "1") == "2":
+        result["two_hop"] = [dict(n._asdict(), paths=paths) for n, paths in competitor_graph.two_hop(ticker, hop1)]
+    return jsonify(result)
 
-        stock_prices, time_labels = fetch_stock_price(ticker, time_range)
-        if not stock_prices or not time_labels:
-            # fetch_stock_price already returns mock data on failure, so this check is mostly for clarity
-            print(f"Could not fetch real stock prices for {ticker}, using mock data.")
-            # Fallback for stock prices is already handled in fetch_stock_price itself
+@backend.route("/quotes/stream", methods=["GET"])
+@login_required
+def stream_quotes():
+    # Server-sent events with live quotes, every viewer of a ticker shares one upstream poller
+    tickers = list(dict.fromkeys(t.strip().upper() for t in request.args.get("tickers", "").split(",") if t.strip()))
+    if not tickers:
+        return jsonify(success=False, error="No tickers provided."), 400
+    if len(tickers) > MAX_STREAM_TICKERS:
+        return jsonify(success=False, error=f"At most {MAX_STREAM_TICKERS} tickers per stream."), 400
 
-        competitors = None 
-        if time_range == "3mo": # Only fetch competitors on initial analysis
-            competitors = query_gemini_llm(company_name)  
+    hub = get_quote_hub()
+    subscriber = queue.Queue(maxsize=hub.queue_size)
+    for ticker in tickers:
+        hub.subscribe(ticker, subscriber)
 
-        if not competitors:
-            competitors = [{"name": "No Sectors", "competitors": ["No competitors found."]}]
+    def events():
+        try:
+            while True:
+                try:
+                    quote = subscriber.get(timeout=15)
+                    yield f"event: quote\ndata: {json.dumps(quote)}\n\n"
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            # Runs when the client disconnects
+            for ticker in tickers:
+                hub.unsubscribe(ticker, subscriber)
 
-        all_competitors = [comp for sector in competitors for comp in sector["competitors"]]
-        top_competitors = get_top_competitors(all_competitors)
-        
-        # Fetch news articles with sentiment
-        news_analyzer = NewsSentimentAnalyzer()
-        news_articles = news_analyzer.get_company_news(company_name, ticker)
-        sentiment_summary = news_analyzer.get_sentiment_summary(news_articles)
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        return jsonify(
-            success=True,
-            description=summary,
-            ticker=ticker,
-            stock_prices=stock_prices,
-            time_labels=time_labels,
-            competitors=competitors,
-            top_competitors=top_competitors,
-            news_articles=news_articles,  # Add news articles to the response
-            news_summary=sentiment_summary # Add news summary to the response
-        )
+@backend.route("/admin/quotes", methods=["GET"])
+@admin_required
+def quote_hub_stats():
+    return jsonify(success=True, **get_quote_hub().stats())
+
+@backend.route("/admin/snapshots/refresh", methods=["POST"])
+@admin_required
+def refresh_market_snapshots():
+    # Refresh the given tickers (comma separated) now, or whatever is due
+    tickers = [t.strip().upper() for t in request.values.get("tickers", "").split(",") if t.strip()]
+    return jsonify(success=True, **market_snapshot.refresh_snapshots(tickers or None))
+
+@backend.route("/admin/profiles", methods=["GET"])
+@admin_required
+def list_profiles():
+    return jsonify(success=True, traces=get_profiler().traces())
+
+@backend.route("/admin/profiles/collapsed", methods=["GET"])
+@admin_required
+def download_profiles():
+    # Collapsed stacks for flamegraph.pl / speedscope, one trace by id or all traces (optionally by name) merged
+    body = get_profiler().collapsed(request.args.get("id"), request.args.get("name"))
+    return Response(body, mimetype="text/plain", headers={"Content-Disposition": "attachment; filename=stockmind.folded"})
+
+@backend.route("/admin/alerts", methods=["GET"])
+@admin_required
+def alert_queue_stats():
+    return jsonify(success=True, **alert_queue.summary())
+
+@backend.route("/admin/cache", methods=["GET"])
+@admin_required
+def response_cache_stats():
+    return jsonify(success=True, entries=len(RESPONSE_CACHE), bytes=RESPONSE_CACHE.bytes, stats=RESPONSE_CACHE.stats)
+
+@backend.route("/admin/startup", methods=["GET"])
+@admin_required
+def startup_report():
+    return jsonify(success=True, timings=current_app.config.get("STARTUP_TIMINGS", {}))
+
+@backend.route("/admin/cache/invalidate", methods=["POST"])
+@admin_required
+def invalidate_response_cache():
+    # No company_name/time_range drops everything
+    company_name = request.values.get("company_name")
+    time_range = request.values.get("time_range")
+    company_key = response_cache_key(company_name, time_range)[0] if company_name else None
+    invalidated = RESPONSE_CACHE.invalidate(
+        lambda key: (company_key is None or key[0] == company_key) and (time_range is None or key[1] == time_range)
+    )
+    return jsonify(success=True, invalidated=invalidated, entries=len(RESPONSE_CACHE))
+
+
+@backend.route("/analyze_companies", methods=["POST"])
+@login_required
+def analyze_companies():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get("company_names"), list):
+        return jsonify(success=False, error="Expected a JSON object with a company_names list."), 400
+    company_names = [name.strip() for name in payload["company_names"] if isinstance(name, str) and name.strip()]
+    time_range = payload.get("time_range", "3mo")
+
+    if not company_names:
+        return jsonify(success=False, error="No company names provided.")
+    if len(company_names) > MAX_BATCH_SIZE:
+        return jsonify(success=False, error=f"At most {MAX_BATCH_SIZE} companies can be analyzed at once."), 400
+
+    try:
+        # Same company asked twice (in any casing) is analyzed once, under its first spelling
+        first_spelling = {}
+        for name in company_names:
+            first_spelling.setdefault(name.lower(), name)
+        companies = list(first_spelling.values())
+        tickers = {company: get_ticker_from_alpha_vantage(company) for company in companies}
+        for company, ticker in tickers.items():
+            cache_warmer.record(company, ticker)
+
+        # Competitors, only on the initial 3 month analysis like /analyze_company
+        sectors = {}
+        top_competitors = {}
+        if time_range == "3mo":
+            uncached = {}
+            fresh = []  # answered by Gemini, stored in the graph once tickers are resolved
+            for company in companies:
+                cached = COMPETITOR_CACHE.get(company.lower())
+                if cached is not None:
+                    sectors[company], top_competitors[company] = cached
+                else:
+                    sectors[company], asked_gemini = find_competitors(company)
+                    if not sectors[company]:
+                        sectors[company] = [{"name": "No Sectors", "competitors": ["No competitors found."]}]
+                    elif asked_gemini:
+                        fresh.append(company)
+                    uncached[company] = [comp for sector in sectors[company] for comp in sector["competitors"]]
+            selected = select_top_competitors_batch(uncached)
+            for company in fresh:
+                remember_competitors(company, sectors[company])
+        else:
+            # Same placeholder and fallback competitors /analyze_company answers with
+            selected = {}
+            placeholder = [{"name": "No Sectors", "competitors": ["No competitors found."]}]
+            placeholder_top = get_top_competitors(placeholder[0]["competitors"])
+            for company in companies:
+                sectors[company], top_competitors[company] = placeholder, placeholder_top
+
+        # One download for the companies and all of their newly selected competitors
+        price_tickers = list(tickers.values())
+        competitor_tickers = [ticker for top in selected.values() for _, ticker, _ in top]
+        if time_range == "3mo":
+            prices = fetch_stock_prices_batch(price_tickers + competitor_tickers, time_range)
+        else:
+            prices = fetch_stock_prices_batch(price_tickers, time_range)
+
+        for company, top in selected.items():
+            top_competitors[company] = [
+                {
+                    "name": name,
+                    "ticker": ticker,
+                    "market_cap": market_cap,
+                    "series": prices[ticker],
+                }
+                for name, ticker, market_cap in top
+            ] or get_top_competitors([])
+            COMPETITOR_CACHE.set(company.lower(), (sectors[company], top_competitors[company]),
+                                 ttl=competitor_cache_ttl(sectors[company], top_competitors[company]))
+
+        # Descriptions are independent per company, fetch them side by side
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            summaries = dict(zip(companies, pool.map(fetch_wikipedia_summary, companies)))
+        news = get_cached_news_batch(tickers)
+
+        results = {}
+        for company in companies:
+            ticker = tickers[company]
+            analytics = None
+            if time_range == "3mo":
+                analytics = get_competitor_analytics(ticker, prices[ticker], top_competitors[company], time_range)
+            stock_prices, time_labels = prices[ticker].to_json()
+            news_articles, sentiment_summary, competitor_sentiment = news[company]
+            results[company] = {
+                "description": summaries[company][1] or "No description found for this company.",
+                "ticker": ticker,
+                "stock_prices": stock_prices,
+                "time_labels": time_labels,
+                "competitors": sectors[company],
+                "top_competitors": competitors_to_json(top_competitors[company]),
+                "competitor_analytics": analytics,
+                "news_articles": news_articles,
+                "news_summary": sentiment_summary,
+                "competitor_sentiment": competitor_sentiment,
+            }
+
+        return jsonify(success=True, time_range=time_range, results=results)
     except Exception as e:
-        print(f"Unhandled error in analyze_company for {company_name}: {e}")
+        print(f"Unhandled error in analyze_companies for {company_names}: {e}")
         return jsonify(success=False, error=f"An unexpected server error occurred: {str(e)}"), 500
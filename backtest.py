@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from price_series import PriceSeries
+
+RSI_WINDOW = 14
+
+
+def rsi(closes: np.ndarray, window: int = RSI_WINDOW) -> np.ndarray:
+    """
+    Wilder's RSI, computed like ta.momentum.RSIIndicator. Live checks run it over
+    RSI_HISTORY_PERIOD of closes, long enough for the warm-up to no longer matter,
+    so they agree with the value backtests get from years of history.
+    """
+    diff = pd.Series(closes).diff()
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    ema_up = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    ema_down = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+
+
+def backtest_alerts(series: PriceSeries, alerts: List[Dict]) -> List[Dict]:
+    """
+    Replay price and RSI alerts over a daily price history.
+
+    All alerts are evaluated together: each one becomes a column of a
+    day x alert matrix (closes or RSI, depending on the type) that is compared
+    with its threshold in a single vectorized step. An alert fires on every day its
+    condition turns true after having been false, like a live alert checked once a day.
+    The conditions match check_price_alert (>=, <=) and check_rsi_alert (>, <), closes
+    are rounded to cents, so RSI values can differ from live ones by a fraction of a point.
+
+    Args:
+        series (PriceSeries): Daily closes, oldest first
+        alerts (List[Dict]): Alerts shaped like the ones create_alert stores
+            ('type', 'target' or 'threshold', 'direction')
+
+    Returns:
+        List[Dict]: Per alert, in order: fire_count, fire_dates, days_triggered
+        (days the condition held) and triggered_now
+    """
+    if not alerts:
+        return []
+    closes = series.rounded()
+    is_rsi = np.array([alert["type"] == "rsi" for alert in alerts])
+    levels = np.array([alert["threshold"] if alert["type"] == "rsi" else alert["target"] for alert in alerts], dtype=np.float64)
+    signs = np.array([1.0 if alert["direction"] == "above" else -1.0 for alert in alerts])
+
+    # day x alert matrix of the value each alert watches
+    values = np.repeat(closes[:, None], len(alerts), axis=1)
+    if is_rsi.any():
+        values[:, is_rsi] = rsi(closes)[:, None]
+
+    with np.errstate(invalid="ignore"):
+        distance = signs * (values - levels)
+        # NaN (RSI warm-up) compares False
+        condition = np.where(is_rsi, distance > 0, distance >= 0)
+    fired = condition.copy()
+    fired[1:] &= ~condition[:-1]
+
+    # Split the fire days by alert with one nonzero() over the transposed matrix
+    alert_index, day_index = np.nonzero(fired.T)
+    per_alert = np.split(day_index, np.cumsum(np.bincount(alert_index, minlength=len(alerts)))[:-1])
+    labels = series.days.astype("datetime64[D]")
+    days_triggered = condition.sum(axis=0)
+
+    return [
+        {
+            "fire_count": int(days.size),
+            "fire_dates": np.datetime_as_string(labels[days], unit="D").tolist(),
+            "days_triggered": int(days_triggered[i]),
+            "triggered_now": bool(condition[-1, i]) if len(condition) else False,
+        }
+        for i, days in enumerate(per_alert)
+    ]
@@ -0,0 +1,251 @@
+"""
+Scalability benchmark for the alert scheduler.
+
+Generates a large alert population with Zipf-skewed tickers and evaluates it
+against the synthetic market (optionally with simulated provider latency),
+printing one JSON object per population size.
+
+--mode sweep (default) times full check_alerts() cycles. Every cycle starts
+with empty quote/RSI/volatility caches, like a real sweep 2 minutes after
+the last one finds them expired:
+
+    python -m benchmarks.alert_scheduler --alerts 10000 100000 --cycles 3 > bench.jsonl
+
+--mode adaptive drives an AlertQueue through --hours of simulated time from
+a session open, one run() per --tick seconds, and compares its checks with
+the ones the sweep makes every --interval over the same span. Caches are
+expired on the simulated clock:
+
+    python -m benchmarks.alert_scheduler --mode adaptive --alerts 2000
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime
+
+import numpy as np
+
+from alert_system import scheduler
+from alert_system.adaptive import AlertQueue
+from alert_system.alert_manager import RSI_CACHE, VOLATILITY_CACHE
+from market_data import set_market_provider
+from market_hours import EXCHANGE_TZ, next_open
+from quote_hub import get_quote_hub
+from synthetic_market import SyntheticMarket
+
+
+class CountingProvider:
+    """Wraps a provider, counting calls and adding a fixed delay per call."""
+    def __init__(self, provider, latency=0.0):
+        self.provider = provider
+        self.latency = latency
+        self.name = provider.name
+        self.calls = Counter()
+
+    def history(self, ticker, period="3mo"):
+        self.calls[period] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.provider.history(ticker, period)
+
+    def download(self, tickers, period="3mo"):
+        self.calls["download"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.provider.download(tickers, period)
+
+    def market_cap(self, ticker):
+        self.calls["market_cap"] += 1
+        return self.provider.market_cap(ticker)
+
+
+def generate_alerts(market, count, tickers=2000, skew=1.1, rsi_share=0.3, seed=0):
+    """Alerts spread over `tickers` symbols with Zipf popularity, targets around the current price."""
+    rng = np.random.default_rng(seed)
+    universe = market.universe(tickers)
+    weights = 1.0 / np.arange(1, tickers + 1) ** skew
+    picks = rng.choice(tickers, size=count, p=weights / weights.sum())
+    kinds = rng.random(count) < rsi_share
+    directions = rng.random(count) < 0.5
+    moves = rng.normal(0.0, 0.1, count)
+    last_prices = {}
+    alerts = []
+    for i in range(count):
+        ticker = universe[picks[i]]
+        if ticker not in last_prices:
+            last_prices[ticker] = float(market.series(ticker, "1d").prices[-1])
+        alerts.append({
+            'type': 'rsi' if kinds[i] else 'price',
+            'ticker': ticker,
+            'target': round(last_prices[ticker] * (1 + moves[i]), 2),
+            'threshold': float(rng.choice([30, 70])),
+            'direction': 'above' if directions[i] else 'below',
+            'email': f"user{i}@example.com",
+        })
+    return alerts
+
+
+def clear_caches():
+    """Forget every quote, RSI and volatility the alert checks cached, so the next check fetches again."""
+    get_quote_hub().clear()
+    RSI_CACHE.clear()
+    VOLATILITY_CACHE.clear()
+
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_scenario(market, count, cycles, interval, latency, tickers, skew, seed):
+    provider = CountingProvider(market, latency)
+    set_market_provider(provider)
+
+    tracemalloc.start()
+    alerts = generate_alerts(market, count, tickers, skew, seed=seed)
+    alerts_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    scheduler.alerts[:] = alerts
+    cycle_times = []
+    fetches = []
+    for _ in range(cycles):
+        clear_caches()
+        provider.calls.clear()
+        gc.collect()
+        start = time.perf_counter()
+        # check_alerts prints every triggered alert
+        with contextlib.redirect_stdout(io.StringIO()):
+            scheduler.check_alerts()
+        cycle_times.append(time.perf_counter() - start)
+        fetches.append(dict(provider.calls))
+
+    # With max_instances=1 every fire time that passes while a cycle is still running is skipped
+    missed = sum(math.floor(t / interval) for t in cycle_times)
+    overlapping = sum(1 for t in cycle_times if t > interval)
+    scheduler.alerts[:] = []
+    clear_caches()
+
+    return {
+        "mode": "sweep",
+        "alerts": count,
+        "distinct_tickers": len({a['ticker'] for a in alerts}),
+        "cycles": cycles,
+        "interval_seconds": interval,
+        "provider_latency_ms": latency * 1000,
+        "cycle_seconds": {
+            "min": min(cycle_times),
+            "mean": sum(cycle_times) / len(cycle_times),
+            "max": max(cycle_times),
+        },
+        "alerts_per_second": count / (sum(cycle_times) / len(cycle_times)),
+        "fetches_per_cycle": fetches[-1],
+        "fetch_calls_per_cycle": sum(fetches[-1].values()),
+        "alerts_memory_mb": alerts_bytes / (1024 * 1024),
+        "max_rss_mb": max_rss_mb(),
+        "missed_runs": missed,
+        "overlapping_cycles": overlapping,
+        "fits_interval": max(cycle_times) <= interval,
+    }
+
+
+def run_adaptive(market, count, hours, tick, interval, latency, tickers, skew, seed, start):
+    provider = CountingProvider(market, latency)
+    set_market_provider(provider)
+    alerts = generate_alerts(market, count, tickers, skew, seed=seed)
+
+    opened = next_open(datetime.combine(start, datetime.min.time(), tzinfo=EXCHANGE_TZ)).timestamp()
+    ticks = int(hours * 3600 / tick)
+    now = opened
+    queue = AlertQueue(alerts, clock=lambda: now)
+
+    # The caches expire on the wall clock, which barely moves here, so they are
+    # cleared once their TTL (or the quote max_age) has passed in simulated time
+    expiring = [
+        (get_quote_hub().clear, 2 * get_quote_hub().open_interval),
+        (RSI_CACHE.clear, RSI_CACHE.ttl),
+        (VOLATILITY_CACHE.clear, VOLATILITY_CACHE.ttl),
+    ]
+    cleared = {clear: opened for clear, _ in expiring}
+    clear_caches()
+    tick_times = []
+    busy_ticks = 0
+    for i in range(ticks):
+        now = opened + i * tick
+        for clear, ttl in expiring:
+            if now - cleared[clear] >= ttl:
+                clear()
+                cleared[clear] = now
+        started = time.perf_counter()
+        if queue.run(now):
+            busy_ticks += 1
+        tick_times.append(time.perf_counter() - started)
+    clear_caches()
+
+    sweep_checks = count * math.ceil(hours * 3600 / interval)
+    return {
+        "mode": "adaptive",
+        "alerts": count,
+        "distinct_tickers": len({a['ticker'] for a in alerts}),
+        "simulated_hours": hours,
+        "start": datetime.fromtimestamp(opened, EXCHANGE_TZ).isoformat(),
+        "tick_seconds": tick,
+        "ticks": ticks,
+        "busy_ticks": busy_ticks,
+        "provider_latency_ms": latency * 1000,
+        "checks": queue.stats["checks"],
+        "triggered": queue.stats["triggered"],
+        "errors": queue.stats["errors"],
+        "sweep_interval_seconds": interval,
+        "sweep_checks": sweep_checks,
+        "checks_vs_sweep": queue.stats["checks"] / sweep_checks if sweep_checks else None,
+        "fetches": dict(provider.calls),
+        "fetch_calls": sum(provider.calls.values()),
+        "tick_seconds_max": max(tick_times, default=0.0),
+        "wall_seconds": sum(tick_times),
+        "max_rss_mb": max_rss_mb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("sweep", "adaptive"), default="sweep",
+                        help="time full check_alerts() sweeps, or simulate AlertQueue over --hours")
+    parser.add_argument("--alerts", type=int, nargs="+", default=[1000, 10000], help="alert population sizes to run")
+    parser.add_argument("--cycles", type=int, default=3, help="evaluation cycles per population")
+    parser.add_argument("--interval", type=float, default=120.0, help="scheduler interval in seconds (start_scheduler uses 2 minutes)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated provider latency per fetch")
+    parser.add_argument("--tickers", type=int, default=2000, help="distinct tickers to draw alerts from")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of ticker popularity")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hours", type=float, default=24.0, help="simulated span of the adaptive run")
+    parser.add_argument("--tick", type=float, default=scheduler.ALERT_TICK_SECONDS,
+                        help="seconds between AlertQueue runs in the adaptive run")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 3, 4),
+                        help="the adaptive run starts at the first session open from this day")
+    args = parser.parse_args(argv)
+
+    market = SyntheticMarket(seed=args.seed, universe_size=max(args.tickers, 1))
+    for count in args.alerts:
+        if args.mode == "adaptive":
+            result = run_adaptive(market, count, args.hours, args.tick, args.interval, args.latency_ms / 1000,
+                                  args.tickers, args.skew, args.seed, args.start)
+        else:
+            result = run_scenario(market, count, args.cycles, args.interval, args.latency_ms / 1000,
+                                  args.tickers, args.skew, args.seed)
+        result["python"] = platform.python_version()
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache whose entries expire after a fixed time-to-live.
+
+    When the cache is full the entry that was inserted first is dropped.
+    """
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires_at, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """Seconds until the entry expires, or None if it is missing or already expired."""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_Entry = namedtuple("_Entry", ["value", "size", "fresh_until", "stale_until"])
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered responses with stale-while-revalidate.
+
+    Fresh entries are served as is. Entries past `ttl` but within
+    `stale_ttl` are still served while a single background rebuild runs.
+    Concurrent misses for the same key wait for one shared build instead of
+    each rebuilding it. Values are bytes and the total size is kept under
+    `max_bytes` by evicting the least recently used entries.
+    """
+    def __init__(self, ttl: float, stale_ttl: float, max_bytes: int, max_workers: int = 4):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.stats = {"hit": 0, "stale": 0, "miss": 0, "coalesced": 0, "evicted": 0}
+        self._entries = OrderedDict()  # key -> _Entry, least recently used first
+        self._inflight = {}  # key -> Future of the running build
+        self._generation = 0  # bumped by invalidate() so builds started earlier are not stored
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="response-cache")
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        """
+        Returns:
+            Tuple[bytes, str]: The response and how it was served: HIT, STALE, MISS or COALESCED
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                if now < entry.fresh_until:
+                    self.stats["hit"] += 1
+                    return entry.value, "HIT"
+                self.stats["stale"] += 1
+                if key not in self._inflight:
+                    self._inflight[key] = self._executor.submit(self._build, key, build, self._generation)
+                return entry.value, "STALE"
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                state = "COALESCED"
+            else:
+                self.stats["miss"] += 1
+                state = "MISS"
+                future = self._inflight[key] = Future()
+                generation = self._generation
+
+        if state == "MISS":
+            try:
+                future.set_result(self._build(key, build, generation))
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result(), state
+
+    def _build(self, key, build, generation):
+        try:
+            value = build()
+        except BaseException as e:
+            logger.error(f"Building cached response for {key} failed: {e}")
+            with self._lock:
+                self._inflight.pop(key, None)
+            raise
+        # Store and clear the in-flight marker together, otherwise a request in
+        # between sees neither and starts a second build
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, value, generation)
+        return value
+
+    def _store(self, key, value, generation):
+        # Caller holds self._lock
+        size = len(value)
+        now = time.monotonic()
+        if generation != self._generation or size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old.size
+        self._entries[key] = _Entry(value, size, now + self.ttl, now + self.ttl + self.stale_ttl)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.stats["evicted"] += 1
+
+    def invalidate(self, match: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Drop every entry whose key satisfies `match` (all entries if None), returns how many were dropped."""
+        with self._lock:
+            self._generation += 1
+            keys = [key for key in self._entries if match is None or match(key)]
+            for key in keys:
+                self.bytes -= self._entries.pop(key).size
+            return len(keys)
+
+    def __len__(self):
+        return len(self._entries)
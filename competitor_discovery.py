@@ -0,0 +1,299 @@
+"""
+Bulk competitor discovery with Gemini.
+
+Sends many companies per Gemini call with a JSON response schema, validates
+the returned competitors against the ticker resolver and stores them in the
+CompetitorDiscovery table and the competitor graph, where query_gemini_llm()
+picks them up. Gemini tickers that neither the resolver nor the market snapshot
+table know are stored as unverified and not used until a later run confirms them
+(--verify checks them with the market data provider right away).
+Every batch is committed on its own, so an interrupted run resumes where it
+stopped when started again:
+
+    python competitor_discovery.py sp500.txt --batch-size 25
+
+The input file has one company per line, optionally followed by ",TICKER".
+"""
+import argparse
+import json
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from flask import has_app_context
+
+from database_model import db, CompetitorDiscovery
+from market_data import get_market_provider
+from rate_limit import get_limiter
+import market_snapshot
+import competitor_graph
+
+logger = logging.getLogger(__name__)
+
+TICKER_PATTERN = re.compile(r"^[A-Z]{1,5}([.-][A-Z]{1,2})?$")
+
+RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "company": {"type": "STRING"},
+            "ticker": {"type": "STRING"},
+            "sectors": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "name": {"type": "STRING"},
+                        "competitors": {
+                            "type": "ARRAY",
+                            "items": {
+                                "type": "OBJECT",
+                                "properties": {
+                                    "name": {"type": "STRING"},
+                                    "ticker": {"type": "STRING"},
+                                },
+                                "required": ["name", "ticker"],
+                            },
+                        },
+                    },
+                    "required": ["name", "competitors"],
+                },
+            },
+        },
+        "required": ["company", "sectors"],
+    },
+}
+
+
+def normalize_company(company_name: str) -> str:
+    return " ".join(company_name.lower().split())
+
+
+def lookup(company_name: str) -> Optional[Tuple[List[Dict], Dict[str, str]]]:
+    """
+    Stored discovery for a company.
+
+    Returns:
+        Optional[Tuple[List[Dict], Dict[str, str]]]: (sectors, competitor name -> ticker),
+        None if the company hasn't been discovered or there is no app context.
+        Competitors with an unverified ticker are left out.
+    """
+    if not has_app_context():
+        return None
+    row = CompetitorDiscovery.query.filter_by(company=normalize_company(company_name)).first()
+    if row is None:
+        return None
+    sectors = []
+    for sector in row.sectors:
+        names = [name for name in sector["competitors"] if name in row.tickers]
+        if names:
+            sectors.append({"name": sector["name"], "competitors": names})
+    return sectors, row.tickers
+
+
+def query_gemini_batch(companies: List[str], per_sector: int = 5, attempts: int = 3) -> Dict[str, Dict]:
+    """
+    Ask Gemini for the sectors and competitors of several companies in one call.
+
+    Returns:
+        Dict[str, Dict]: normalized company name -> {"ticker": str, "sectors": [...]} as returned
+    """
+    from backend import get_gemini_client
+    client = get_gemini_client()
+    if client is None:
+        raise RuntimeError("Gemini client not initialized")
+
+    prompt = f"""
+    For each company in this JSON list, give the sectors it operates in and for each sector
+    up to {per_sector} major, publicly traded direct competitors with their primary US ticker symbol.
+    Also give the company's own ticker. Use the company names exactly as given.
+    Companies: {json.dumps(companies)}
+    """
+    for attempt in range(1, attempts + 1):
+        get_limiter("gemini").wait()
+        try:
+            response = client.models.generate_content(
+                model="gemini-1.5-flash",
+                contents=prompt,
+                config={"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA},
+            )
+            items = json.loads(response.candidates[0].content.parts[0].text)
+            return {normalize_company(item["company"]): item for item in items if item.get("company")}
+        except Exception as e:
+            logger.warning(f"Gemini batch of {len(companies)} failed (attempt {attempt}/{attempts}): {e}")
+            if attempt == attempts:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def verified_tickers(candidates, verify: bool = False) -> Set[str]:
+    """
+    Candidate tickers known to exist: those with a row in the market snapshot table,
+    and with verify=True also those the market data provider has a market cap for.
+    """
+    candidates = set(candidates)
+    known = set(market_snapshot.market_caps(candidates))
+    if verify:
+        for ticker in candidates - known:
+            get_limiter("yfinance").wait()
+            try:
+                if get_market_provider().market_cap(ticker):
+                    known.add(ticker)
+            except Exception as e:
+                logger.warning(f"Could not verify ticker {ticker}: {e}")
+    return known
+
+
+def validate(company_ticker: Optional[str], sectors: List[Dict], verify: bool = False) -> Tuple[List[Dict], Dict[str, str], Dict[str, str]]:
+    """
+    Resolve competitor tickers and drop duplicates and the company itself.
+
+    A ticker is trusted when the whole name is known to the ticker resolver
+    (lookup_exact_ticker, no substring matches) and Gemini didn't suggest a
+    different one. Any other Gemini ticker is only trusted once it is confirmed
+    by verified_tickers(). Unconfirmed ones are kept apart and queued for
+    the next market snapshot refresh, so a later --refresh run can confirm them.
+    With verify=True names without a usable Gemini ticker are also looked up with
+    Alpha Vantage (slow, 5 calls per minute on the free tier).
+
+    Returns:
+        Tuple[List[Dict], Dict[str, str], Dict[str, str]]: (sectors, name -> verified ticker,
+        name -> unverified Gemini ticker)
+    """
+    from backend import lookup_exact_ticker, get_ticker_from_alpha_vantage
+    resolved = {}  # name -> (ticker, trusted)
+    for sector in sectors:
+        for competitor in sector.get("competitors", []):
+            name = (competitor.get("name") or "").strip()
+            if not name or name in resolved:
+                continue
+            suggested = (competitor.get("ticker") or "").strip().upper()
+            if not TICKER_PATTERN.match(suggested):
+                suggested = None
+            known = lookup_exact_ticker(name)
+            if known is not None and suggested in (None, known):
+                resolved[name] = (known, True)
+            elif suggested:
+                # Disagreeing with the resolver doesn't make Gemini wrong, it has to be confirmed like any other
+                resolved[name] = (suggested, False)
+            elif verify:
+                get_ticker_from_alpha_vantage(name)
+                # Only real matches are cached, guesses are not
+                known = lookup_exact_ticker(name)
+                if known is not None:
+                    resolved[name] = (known, True)
+
+    confirmed = verified_tickers({t for t, trusted in resolved.values() if not trusted}, verify)
+    seen = {company_ticker} if company_ticker else set()
+    tickers = {}
+    unverified = {}
+    cleaned = []
+    for sector in sectors:
+        names = []
+        for competitor in sector.get("competitors", []):
+            name = (competitor.get("name") or "").strip()
+            if name not in resolved or resolved[name][0] in seen:
+                continue
+            ticker, trusted = resolved[name]
+            seen.add(ticker)
+            if trusted or ticker in confirmed:
+                tickers[name] = ticker
+            else:
+                unverified[name] = ticker
+            names.append(name)
+        if names:
+            cleaned.append({"name": sector.get("name", "").strip() or "Competitors", "competitors": names})
+    market_snapshot.track(unverified.values())
+    return cleaned, tickers, unverified
+
+
+def discover(companies: List[Tuple[str, Optional[str]]], batch_size: int = 25,
+             refresh: bool = False, verify: bool = False) -> Dict[str, int]:
+    """
+    Discover and store competitors for (company name, ticker or None) pairs.
+    Needs an app context. Companies already stored are skipped unless refresh is set.
+    """
+    from backend import lookup_exact_ticker
+    done = set() if refresh else {row.company for row in CompetitorDiscovery.query.with_entities(CompetitorDiscovery.company)}
+    pending = [(name, ticker) for name, ticker in companies if normalize_company(name) not in done]
+    stats = {"skipped": len(companies) - len(pending), "stored": 0, "missing": 0, "unverified": 0, "failed_batches": 0, "calls": 0}
+    logger.info(f"Discovering competitors for {len(pending)} companies ({stats['skipped']} already stored)")
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        stats["calls"] += 1
+        try:
+            results = query_gemini_batch([name for name, _ in batch])
+        except Exception as e:
+            # Left for the next run
+            logger.error(f"Skipping batch starting at {batch[0][0]}: {e}")
+            stats["failed_batches"] += 1
+            continue
+
+        stored = []
+        for name, ticker in batch:
+            item = results.get(normalize_company(name))
+            if not item:
+                stats["missing"] += 1
+                continue
+            if not ticker:
+                # Same rule as the competitors in validate(), tickers given in the input file are trusted
+                suggested = (item.get("ticker") or "").strip().upper()
+                suggested = suggested if TICKER_PATTERN.match(suggested) else None
+                known = lookup_exact_ticker(name)
+                if known is not None and suggested in (None, known):
+                    ticker = known
+                elif suggested and verified_tickers([suggested], verify):
+                    ticker = suggested
+                elif suggested:
+                    market_snapshot.track([suggested])
+            sectors, tickers, unverified = validate(ticker, item.get("sectors", []), verify)
+            row = CompetitorDiscovery.query.filter_by(company=normalize_company(name)).first()
+            if row is None:
+                row = CompetitorDiscovery(company=normalize_company(name))
+                db.session.add(row)
+            row.ticker = ticker
+            row.sectors = sectors
+            row.tickers = tickers
+            row.unverified = unverified
+            stats["unverified"] += len(unverified)
+            stored.append((name, ticker, sectors, tickers))
+            stats["stored"] += 1
+        db.session.commit()
+        for name, ticker, sectors, tickers in stored:
+            competitor_graph.record(name, ticker, sectors, tickers)
+        logger.info(f"Stored batch {start // batch_size + 1}, {stats['stored']} companies so far")
+    return stats
+
+
+def read_companies(path: str) -> List[Tuple[str, Optional[str]]]:
+    companies = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            name, _, ticker = line.strip().partition(",")
+            if name.strip():
+                companies.append((name.strip(), ticker.strip().upper() or None))
+    return companies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("companies", help="file with one company per line (optionally 'name,TICKER')")
+    parser.add_argument("--batch-size", type=int, default=25, help="companies per Gemini call")
+    parser.add_argument("--refresh", action="store_true", help="rediscover companies that are already stored")
+    parser.add_argument("--verify", action="store_true",
+                        help="confirm tickers missing from the snapshot table with the market data provider "
+                             "and look up names without a ticker with Alpha Vantage")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    app = create_app(start_background=False)
+    with app.app_context():
+        stats = discover(read_companies(args.companies), args.batch_size, args.refresh, args.verify)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Persistent graph of which companies compete with which.
+
+Every competitor list we get from Gemini (or competitor_discovery.py) is
+stored as ticker -> ticker edges in the CompetitorEdge table. Edges are
+read in both directions, so a company that has only ever shown up as
+someone else's competitor can still be answered locally: its reverse
+neighbors, topped up with the same-sector competitors of those neighbors.
+"""
+import os
+from collections import Counter, OrderedDict, namedtuple
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import has_app_context
+
+from database_model import db, CompetitorEdge, CompetitorDiscovery
+
+# reverse: the edge points at us (the neighbor listed us as its competitor)
+Neighbor = namedtuple("Neighbor", ["ticker", "name", "sector", "reverse"])
+
+TWO_HOP_FILL = int(os.getenv("GRAPH_TWO_HOP_FILL", 5))  # extra competitors per sector for reverse-only companies
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def record(company_name: str, ticker: str, sectors: List[Dict], tickers: Dict[str, str]) -> int:
+    """
+    Replace a company's outgoing edges.
+
+    Only edges recorded under this company name are replaced, so a name that resolved
+    to somebody else's ticker can't wipe out that company's competitors.
+
+    Args:
+        company_name (str): Company the competitors belong to
+        ticker (str): Its ticker
+        sectors (List[Dict]): [{"name": sector, "competitors": [names]}] as query_gemini_llm returns
+        tickers (Dict[str, str]): Competitor name -> ticker, names without a ticker are skipped
+
+    Returns:
+        int: Number of edges stored (0 without an app context)
+    """
+    if not has_app_context() or not ticker:
+        return 0
+    source_key = normalize_name(company_name)[:120]
+    CompetitorEdge.query.filter_by(source_key=source_key).delete()
+    now = datetime.utcnow()
+    seen = set()
+    for sector in sectors:
+        sector_name = sector.get("name", "").strip()[:120]
+        for name in sector.get("competitors", []):
+            target = tickers.get(name)
+            if not target or target == ticker or (target, sector_name) in seen:
+                continue
+            seen.add((target, sector_name))
+            # merge: another name of the same company may have stored this edge already
+            db.session.merge(CompetitorEdge(
+                source_ticker=ticker, target_ticker=target, sector=sector_name,
+                source_name=company_name[:120], target_name=name[:120],
+                source_key=source_key, target_key=normalize_name(name)[:120],
+                updated_at=now,
+            ))
+    db.session.commit()
+    return len(seen)
+
+
+def adjacency(tickers: Iterable[str]) -> Dict[str, List[Neighbor]]:
+    """Neighbors of several tickers, forward and reverse edges, in two indexed queries."""
+    tickers = list(set(tickers))
+    result = {ticker: [] for ticker in tickers}
+    if not tickers or not has_app_context():
+        return result
+    for edge in CompetitorEdge.query.filter(CompetitorEdge.source_ticker.in_(tickers)):
+        result[edge.source_ticker].append(Neighbor(edge.target_ticker, edge.target_name, edge.sector, False))
+    for edge in CompetitorEdge.query.filter(CompetitorEdge.target_ticker.in_(tickers)):
+        result[edge.target_ticker].append(Neighbor(edge.source_ticker, edge.source_name, edge.sector, True))
+    return result
+
+
+def neighbors(ticker: str) -> List[Neighbor]:
+    """Direct competitors, edges the company stated itself come first."""
+    return sorted(adjacency([ticker])[ticker], key=lambda n: n.reverse)
+
+
+def two_hop(ticker: str, hop1: Optional[List[Neighbor]] = None) -> List[Tuple[Neighbor, int]]:
+    """
+    Competitors of competitors that aren't direct competitors yet.
+
+    Returns:
+        List[Tuple[Neighbor, int]]: (neighbor, number of paths to it), most connected first.
+        The neighbor's sector is the one of the first path found.
+    """
+    hop1 = neighbors(ticker) if hop1 is None else hop1
+    direct = {n.ticker for n in hop1} | {ticker}
+    paths = Counter()
+    first = {}
+    for via in adjacency(direct - {ticker}).values():
+        reached = set()
+        for n in via:
+            if n.ticker not in direct and n.ticker not in reached:
+                reached.add(n.ticker)
+                paths[n.ticker] += 1
+                first.setdefault(n.ticker, n)
+    return [(first[t], count) for t, count in paths.most_common()]
+
+
+def find_ticker(company_name: str) -> Optional[str]:
+    """Ticker of a company seen in the graph (on either end of an edge) or in a discovery run."""
+    if not has_app_context():
+        return None
+    key = normalize_name(company_name)
+    edge = CompetitorEdge.query.filter_by(source_key=key).first()
+    if edge is not None:
+        return edge.source_ticker
+    edge = CompetitorEdge.query.filter_by(target_key=key).first()
+    if edge is not None:
+        return edge.target_ticker
+    row = CompetitorDiscovery.query.filter_by(company=key).first()
+    return row.ticker if row is not None else None
+
+
+def lookup(company_name: str, ticker: Optional[str] = None) -> Optional[Tuple[List[Dict], Dict[str, str]]]:
+    """
+    Competitors of a company answered from the graph.
+
+    Returns:
+        Optional[Tuple[List[Dict], Dict[str, str]]]: (sectors in query_gemini_llm's shape,
+        competitor name -> ticker), None if the graph doesn't know the company
+    """
+    ticker = ticker or find_ticker(company_name)
+    if not ticker:
+        return None
+    hop1 = neighbors(ticker)
+    if not hop1:
+        return None
+
+    sectors = OrderedDict()
+    tickers = {}
+    def add(n):
+        names = sectors.setdefault(n.sector, [])
+        if n.name not in names:
+            names.append(n.name)
+            tickers[n.name] = n.ticker
+
+    for n in hop1:
+        add(n)
+    if all(n.reverse for n in hop1):
+        # Only known as somebody else's competitor, their same-sector competitors are likely ours too
+        fill = Counter()
+        for n, _ in two_hop(ticker, hop1):
+            if n.sector in sectors and fill[n.sector] < TWO_HOP_FILL:
+                add(n)
+                fill[n.sector] += 1
+    return [{"name": sector, "competitors": names} for sector, names in sectors.items()], tickers
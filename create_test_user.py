@@ -1,5 +1,7 @@
-from app import app, db
-from database_model import User
+from app import create_app
+from database_model import db, User
+
+app = create_app(start_background=False)
 
 def create_test_user():
     with app.app_context():
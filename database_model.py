@@ -1,5 +1,6 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
 
 db = SQLAlchemy()
 # User model
@@ -14,4 +15,33 @@ class User(db.Model):
         return check_password_hash(self.password_hash, passw)
     def get_passw_hash(self):
         return self.password_hash
-    
\ No newline at end of file
+
+# Competitors found by the bulk Gemini discovery (competitor_discovery.py)
+class CompetitorDiscovery(db.Model):
+    id = db.Column(db.Integer, primary_key = True)
+    company = db.Column(db.String(120), unique=True, nullable = False, index = True)  # normalized company name
+    ticker = db.Column(db.String(12))
+    sectors = db.Column(db.JSON, nullable = False)  # same shape as query_gemini_llm() returns
+    tickers = db.Column(db.JSON, nullable = False)  # competitor name -> validated ticker
+    unverified = db.Column(db.JSON)  # competitor name -> Gemini ticker not confirmed yet, never used for lookups
+    discovered_at = db.Column(db.DateTime, default = datetime.utcnow, nullable = False)
+
+# Market cap snapshot per ticker, refreshed in bulk by market_snapshot.refresh_snapshots()
+class MarketSnapshot(db.Model):
+    ticker = db.Column(db.String(12), primary_key = True)
+    market_cap = db.Column(db.BigInteger, index = True)
+    shares_outstanding = db.Column(db.BigInteger)
+    sector = db.Column(db.String(80))
+    updated_at = db.Column(db.DateTime, default = datetime.utcnow, nullable = False, index = True)
+
+# Competitor graph, one row per "source lists target as a competitor in sector" edge.
+# Forward lookups use the primary key, reverse ones the target_ticker index.
+class CompetitorEdge(db.Model):
+    source_ticker = db.Column(db.String(12), primary_key = True)
+    target_ticker = db.Column(db.String(12), primary_key = True, index = True)
+    sector = db.Column(db.String(120), primary_key = True)
+    source_name = db.Column(db.String(120), nullable = False)
+    target_name = db.Column(db.String(120), nullable = False)
+    source_key = db.Column(db.String(120), nullable = False, index = True)  # normalized names, to find a ticker by company name
+    target_key = db.Column(db.String(120), nullable = False, index = True)
+    updated_at = db.Column(db.DateTime, default = datetime.utcnow, nullable = False)
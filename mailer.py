@@ -0,0 +1,175 @@
+import smtplib
+import threading
+import queue
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+    Background email delivery queue.
+
+    Messages are handed to a single worker thread which keeps one SMTP
+    connection open between sends and retries failed deliveries, so callers
+    return immediately instead of waiting on the SMTP handshake.
+    Delivery statuses are kept in memory, only the process that submitted a
+    message knows its status.
+    """
+    def __init__(self, host: str, port: int, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: bool = True,
+                 max_retries: int = 3, retry_delay: float = 2.0,
+                 idle_timeout: float = 60.0, max_statuses: int = 1000):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.idle_timeout = idle_timeout
+        self.max_statuses = max_statuses
+
+        self._queue = queue.Queue()
+        self._statuses = OrderedDict()  # delivery id -> status dict, oldest first
+        self._lock = threading.Lock()
+        self._worker = None
+        self._conn = None
+
+    def submit(self, sender: str, recipient: str, message: str) -> str:
+        """
+        Queue a message for delivery.
+
+        Args:
+            sender (str): Envelope sender address
+            recipient (str): Envelope recipient address
+            message (str): Fully rendered message (e.g. MIMEMultipart.as_string())
+
+        Returns:
+            str: Delivery id that can be passed to status()
+        """
+        delivery_id = uuid.uuid4().hex
+        self._set_status(delivery_id, "queued", attempts=0)
+        self._ensure_worker()
+        self._queue.put((delivery_id, sender, recipient, message))
+        return delivery_id
+
+    def status(self, delivery_id: str) -> Optional[Dict]:
+        """
+        Get the delivery status for a submitted message.
+
+        Returns:
+            Optional[Dict]: {'state': queued|sending|retrying|sent|failed, 'attempts': int, 'error': str|None},
+            or None if the id is unknown or has been evicted
+        """
+        with self._lock:
+            status = self._statuses.get(delivery_id)
+            return dict(status) if status else None
+
+    def join(self):
+        """Block until every queued message has been delivered or given up on."""
+        self._queue.join()
+
+    def close(self):
+        """Stop the worker thread and close the SMTP connection."""
+        if self._worker and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._worker = None
+
+    def _set_status(self, delivery_id, state, attempts=None, error=None):
+        with self._lock:
+            status = self._statuses.get(delivery_id, {'attempts': 0})
+            status['state'] = state
+            status['error'] = error
+            if attempts is not None:
+                status['attempts'] = attempts
+            self._statuses[delivery_id] = status
+            self._statuses.move_to_end(delivery_id)
+            while len(self._statuses) > self.max_statuses:
+                self._statuses.popitem(last=False)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="mail-queue", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                # Nothing to send for a while, don't hold the server connection open
+                self._disconnect()
+                continue
+            try:
+                if job is None:
+                    self._disconnect()
+                    return
+                self._deliver(*job)
+            finally:
+                self._queue.task_done()
+
+    def _connection(self) -> smtplib.SMTP:
+        # Reuse the open connection if the server still answers
+        if self._conn is not None:
+            try:
+                if self._conn.noop()[0] == 250:
+                    return self._conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._disconnect()
+
+        conn = smtplib.SMTP(self.host, self.port, timeout=10)
+        try:
+            if self.use_tls:
+                conn.starttls()
+            if self.username and self.password:
+                conn.login(self.username, self.password)
+        except Exception:
+            conn.close()
+            raise
+        self._conn = conn
+        return conn
+
+    def _disconnect(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.quit()
+        except (smtplib.SMTPException, OSError):
+            self._conn.close()
+        self._conn = None
+
+    def _deliver(self, delivery_id, sender, recipient, message):
+        for attempt in range(1, self.max_retries + 1):
+            self._set_status(delivery_id, "sending", attempts=attempt)
+            try:
+                self._connection().sendmail(sender, recipient, message)
+                self._set_status(delivery_id, "sent")
+                return
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPAuthenticationError) as e:
+                # Retrying won't change the answer
+                logger.error(f"Mail delivery {delivery_id} to {recipient} rejected: {e}")
+                self._set_status(delivery_id, "failed", error=str(e))
+                return
+            except (smtplib.SMTPException, OSError) as e:
+                logger.warning(f"Mail delivery {delivery_id} attempt {attempt} failed: {e}")
+                self._disconnect()
+                if attempt == self.max_retries:
+                    self._set_status(delivery_id, "failed", error=str(e))
+                    return
+                self._set_status(delivery_id, "retrying", error=str(e))
+                time.sleep(self.retry_delay * (2 ** (attempt - 1)))
+            except Exception as e:
+                # Bad message or addresses (e.g. non-ASCII recipient, no sender), retrying won't help.
+                # The connection may be left mid-transaction so drop it
+                logger.error(f"Mail delivery {delivery_id} to {recipient} failed: {e!r}")
+                self._disconnect()
+                self._set_status(delivery_id, "failed", error=str(e))
+                return
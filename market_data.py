@@ -0,0 +1,57 @@
+import os
+
+
+class YFinanceProvider:
+    """Market data from Yahoo Finance, yfinance is imported on first use."""
+    name = "yfinance"
+
+    @property
+    def yf(self):
+        import yfinance
+        return yfinance
+
+    def history(self, ticker, period="3mo"):
+        return self.yf.Ticker(ticker).history(period=period)
+
+    def download(self, tickers, period="3mo"):
+        return self.yf.download(list(tickers), period=period, progress=False)
+
+    def market_cap(self, ticker):
+        return self.yf.Ticker(ticker).info.get('marketCap', None)
+
+    def profile(self, ticker):
+        # One .info call for everything the market snapshot stores
+        info = self.yf.Ticker(ticker).info
+        return {
+            "market_cap": info.get('marketCap'),
+            "shares_outstanding": info.get('sharesOutstanding'),
+            "sector": info.get('sector'),
+        }
+
+
+_provider = None
+
+def get_market_provider():
+    # MARKET_PROVIDER=synthetic swaps every price/market cap/news/competitor lookup
+    # for the seeded SyntheticMarket so the app can be load tested offline
+    global _provider
+    if _provider is None:
+        name = os.getenv("MARKET_PROVIDER", "yfinance").lower()
+        if name == "synthetic":
+            from synthetic_market import SyntheticMarket
+            _provider = SyntheticMarket(
+                seed=int(os.getenv("SYNTHETIC_SEED", 0)),
+                universe_size=int(os.getenv("SYNTHETIC_UNIVERSE_SIZE", 5000)),
+            )
+        elif name == "yfinance":
+            _provider = YFinanceProvider()
+        else:
+            raise ValueError(f"Unknown MARKET_PROVIDER {name!r}, expected 'yfinance' or 'synthetic'")
+    return _provider
+
+def set_market_provider(provider):
+    global _provider
+    _provider = provider
+
+def is_synthetic():
+    return get_market_provider().name == "synthetic"
@@ -0,0 +1,94 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+# NYSE/NASDAQ regular session
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+OPEN_TIME = time(9, 30)
+CLOSE_TIME = time(16, 0)
+
+
+def _nth_weekday(year, month, weekday, n):
+    # n-th (1 based) weekday of the month, n=-1 for the last one
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _easter(year):
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+def _observed(day):
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+@lru_cache(maxsize=32)
+def holidays(year):
+    """Full day exchange holidays for a year (early closes are treated as normal days)."""
+    days = {
+        _nth_weekday(year, 1, 0, 3),                 # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                 # Presidents' Day
+        _easter(year) - timedelta(days=2),           # Good Friday
+        _nth_weekday(year, 5, 0, -1),                # Memorial Day
+        _observed(date(year, 7, 4)),                 # Independence Day
+        _nth_weekday(year, 9, 0, 1),                 # Labor Day
+        _nth_weekday(year, 11, 3, 4),                # Thanksgiving
+        _observed(date(year, 12, 25)),               # Christmas
+    }
+    # New Year's Day isn't moved back to a Friday in December
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))      # Juneteenth
+    return frozenset(days)
+
+def is_trading_day(day):
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+def _exchange_now(now=None):
+    return (now or datetime.now(EXCHANGE_TZ)).astimezone(EXCHANGE_TZ)
+
+def is_market_open(now=None):
+    now = _exchange_now(now)
+    return is_trading_day(now.date()) and OPEN_TIME <= now.time() < CLOSE_TIME
+
+def next_open(now=None):
+    """Start of the next regular session, `now` itself if the market is open."""
+    now = _exchange_now(now)
+    if is_market_open(now):
+        return now
+    day = now.date()
+    if now.time() >= OPEN_TIME:
+        day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return datetime.combine(day, OPEN_TIME, tzinfo=EXCHANGE_TZ)
+
+def seconds_until_open(now=None):
+    now = _exchange_now(now)
+    return max(0.0, (next_open(now) - now).total_seconds())
+
+def add_trading_seconds(start, seconds):
+    """Point in time `seconds` of regular session time after `start`, skipping nights, weekends and holidays."""
+    now = next_open(_exchange_now(start))
+    while True:
+        close = datetime.combine(now.date(), CLOSE_TIME, tzinfo=EXCHANGE_TZ)
+        left = (close - now).total_seconds()
+        if seconds < left:
+            return now + timedelta(seconds=seconds)
+        seconds -= left
+        now = next_open(close)
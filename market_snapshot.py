@@ -0,0 +1,127 @@
+"""
+Local market cap snapshots for competitor ranking.
+
+Ranking competitors only needs a rough market cap, so instead of asking
+yfinance for every candidate on every request the values are kept in the
+MarketSnapshot table and refreshed in bulk by a scheduled job.
+Tickers the table doesn't know yet are queued with track() and picked up
+by the next refresh.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from flask import has_app_context
+
+from database_model import db, MarketSnapshot, CompetitorDiscovery
+from market_data import get_market_provider
+from rate_limit import get_limiter
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INTERVAL = int(os.getenv("MARKET_SNAPSHOT_INTERVAL_SECONDS", 6 * 3600))  # how often the refresh job runs
+SNAPSHOT_MAX_AGE = int(os.getenv("MARKET_SNAPSHOT_MAX_AGE_SECONDS", 24 * 3600))   # rows older than this get refreshed
+SNAPSHOT_BATCH = int(os.getenv("MARKET_SNAPSHOT_BATCH", 500))                     # tickers per refresh run
+SNAPSHOT_WORKERS = 8
+
+_pending = set()  # tickers seen in requests that aren't in the table yet
+_pending_lock = threading.Lock()
+
+
+def track(tickers: Iterable[str]):
+    """Queue tickers for the next refresh."""
+    with _pending_lock:
+        _pending.update(t for t in tickers if t)
+
+
+def market_caps(tickers: Iterable[str]) -> Dict[str, int]:
+    """
+    Snapshot market caps for the given tickers in one indexed query.
+
+    Returns:
+        Dict[str, int]: ticker -> market cap, tickers without a snapshot are left out
+        (everything is left out without an app context)
+    """
+    tickers = list(set(tickers))
+    if not tickers or not has_app_context():
+        return {}
+    rows = (
+        MarketSnapshot.query
+        .with_entities(MarketSnapshot.ticker, MarketSnapshot.market_cap)
+        .filter(MarketSnapshot.ticker.in_(tickers), MarketSnapshot.market_cap.isnot(None))
+        .all()
+    )
+    return {ticker: market_cap for ticker, market_cap in rows}
+
+
+def _fetch_profile(ticker: str) -> Optional[Dict]:
+    get_limiter("yfinance").wait()
+    try:
+        return get_market_provider().profile(ticker)
+    except Exception as e:
+        logger.warning(f"Market snapshot for {ticker} failed: {e}")
+        return None
+
+
+def due_tickers(limit: int = SNAPSHOT_BATCH):
+    """Queued tickers first, then tickers from stored discoveries (verified or not) without a snapshot, then the oldest rows."""
+    with _pending_lock:
+        due = list(_pending)[:limit]
+    known = {ticker for (ticker,) in MarketSnapshot.query.with_entities(MarketSnapshot.ticker)}
+    due = [t for t in due if t not in known] + [t for t in due if t in known]
+
+    columns = (CompetitorDiscovery.ticker, CompetitorDiscovery.tickers, CompetitorDiscovery.unverified)
+    for row in CompetitorDiscovery.query.with_entities(*columns):
+        if len(due) >= limit:
+            break
+        # Unverified Gemini tickers too, a snapshot row is what confirms them
+        for ticker in [row.ticker, *row.tickers.values(), *(row.unverified or {}).values()]:
+            if ticker and ticker not in known and ticker not in due:
+                due.append(ticker)
+
+    cutoff = datetime.utcnow() - timedelta(seconds=SNAPSHOT_MAX_AGE)
+    stale = (
+        MarketSnapshot.query
+        .with_entities(MarketSnapshot.ticker)
+        .filter(MarketSnapshot.updated_at < cutoff)
+        .order_by(MarketSnapshot.updated_at)
+        .limit(limit)
+    )
+    due += [ticker for (ticker,) in stale if ticker not in due]
+    return due[:limit]
+
+
+def refresh_snapshots(tickers: Optional[Iterable[str]] = None, max_workers: int = SNAPSHOT_WORKERS) -> Dict[str, int]:
+    """
+    Fetch and store snapshots concurrently, defaults to due_tickers().
+    Needs an app context.
+    """
+    tickers = list(dict.fromkeys(tickers)) if tickers is not None else due_tickers()
+    if not tickers:
+        return {"requested": 0, "stored": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        profiles = dict(zip(tickers, pool.map(_fetch_profile, tickers)))
+
+    now = datetime.utcnow()
+    stored = 0
+    for ticker, profile in profiles.items():
+        if not profile or not profile.get("market_cap"):
+            continue
+        db.session.merge(MarketSnapshot(
+            ticker=ticker,
+            market_cap=int(profile["market_cap"]),
+            shares_outstanding=int(profile["shares_outstanding"]) if profile.get("shares_outstanding") else None,
+            sector=profile.get("sector"),
+            updated_at=now,
+        ))
+        stored += 1
+    db.session.commit()
+
+    with _pending_lock:
+        _pending.difference_update(tickers)
+    logger.info(f"Refreshed {stored} of {len(tickers)} market snapshots")
+    return {"requested": len(tickers), "stored": stored, "failed": len(tickers) - stored}
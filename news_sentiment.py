@@ -10,6 +10,14 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Alpha Vantage's own sentiment scale (ticker/overall_sentiment_score): |score| < 0.15 is neutral
+ALPHA_VANTAGE_NEUTRAL_BAND = 0.15
+# VADER compound scores: |score| < 0.05 is neutral
+VADER_NEUTRAL_BAND = 0.05
+# NewsAPI rejects longer q parameters
+NEWSAPI_MAX_QUERY = 500
+SENTIMENT_EMOJI = {"Positive": "😃", "Negative": "😞", "Neutral": "😐"}
+
 class NewsSentimentAnalyzer:
     """
     A class to fetch news articles and analyze their sentiment for a given company.
@@ -110,32 +118,10 @@ class NewsSentimentAnalyzer:
             response.raise_for_status()
             
             data = response.json()
-            articles = []
             
             if data.get('status') == 'ok' and data.get('articles'):
-                for article in data['articles']:
-                    # Analyze sentiment using VADER's compound score
-                    title = article.get('title', '')
-                    description = article.get('description', '')
-                    content_to_analyze = f"{title}. {description}" if description else title
-                    
-                    sentiment_scores = self.analyze_sentiment(content_to_analyze)
-                    compound_score = sentiment_scores['compound']
-                    
-                    article_data = {
-                        'title': title,
-                        'url': article.get('url', ''),
-                        'published_at': article.get('publishedAt', ''),
-                        'source': article.get('source', {}).get('name', 'Unknown'),
-                        'description': description,
-                        'sentiment_score': compound_score,
-                        'sentiment_label': self.get_sentiment_label(compound_score),
-                        'sentiment_emoji': self.get_sentiment_emoji(compound_score),
-                        'confidence': abs(compound_score)
-                    }
-                    articles.append(article_data)
-            
-            return articles
+                return self.score_articles(data['articles'])
+            return []
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching news from NewsAPI: {e}")
@@ -144,6 +130,105 @@ class NewsSentimentAnalyzer:
             logger.error(f"Unexpected error in fetch_news_newsapi: {e}")
             return []
         
+    def fetch_news_newsapi_multi(self, company_names: List[str], days_back: int = 7,
+                                 limit: int = 10) -> Dict[str, List[Dict]]:
+        """
+        Fetch NewsAPI articles for several companies with one OR query and split them per company.
+        
+        Companies are packed into as few requests as NewsAPI's query length allows, every
+        article is scored once and goes to each company named in its title or description.
+        
+        Args:
+            company_names (List[str]): Companies to search for
+            days_back (int): Number of days to look back for news
+            limit (int): Maximum number of articles per company
+            
+        Returns:
+            Dict[str, List[Dict]]: Scored articles per company (empty list if none)
+        """
+        by_company = {name: [] for name in company_names}
+        if not self.news_api_key:
+            logger.error("NewsAPI key not found in environment variables")
+            return by_company
+        
+        queries = []
+        for name in company_names:
+            term = f'"{name}"'
+            if queries and len(queries[-1]) + len(term) + 4 <= NEWSAPI_MAX_QUERY:
+                queries[-1] += f" OR {term}"
+            else:
+                queries.append(term)
+        
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days_back)
+        raw_articles = []
+        for query in queries:
+            params = {
+                'q': query,
+                'from': start_date.strftime('%Y-%m-%d'),
+                'to': end_date.strftime('%Y-%m-%d'),
+                'sortBy': 'relevancy',
+                'language': 'en',
+                'pageSize': 100,
+                'apiKey': self.news_api_key
+            }
+            try:
+                response = requests.get(self.news_api_url, params=params, timeout=10)
+                response.raise_for_status()
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error fetching news from NewsAPI: {e}")
+                continue
+            except ValueError as e:
+                logger.error(f"Invalid JSON from NewsAPI: {e}")
+                continue
+            if data.get('status') == 'ok':
+                raw_articles.extend(data.get('articles') or [])
+        
+        # The same article can match several query chunks
+        unique = {article.get('url') or article.get('title'): article for article in raw_articles}
+        for article in self.score_articles(list(unique.values())):
+            text = f"{article['title']} {article['description'] or ''}".lower()
+            for name in company_names:
+                if name.lower() in text and len(by_company[name]) < limit:
+                    by_company[name].append(article)
+        return by_company
+        
+    def score_articles(self, raw_articles: List[Dict]) -> List[Dict]:
+        """
+        Score NewsAPI shaped articles with VADER.
+        
+        Args:
+            raw_articles (List[Dict]): Articles with title, description, url, publishedAt and source.name
+            
+        Returns:
+            List[Dict]: List of news articles with sentiment analysis
+        """
+        articles = []
+        for article in raw_articles:
+            # Analyze sentiment using VADER's compound score
+            title = article.get('title', '')
+            description = article.get('description', '')
+            content_to_analyze = f"{title}. {description}" if description else title
+            
+            sentiment_scores = self.analyze_sentiment(content_to_analyze)
+            compound_score = sentiment_scores['compound']
+            
+            article_data = {
+                'title': title,
+                'url': article.get('url', ''),
+                'published_at': article.get('publishedAt', ''),
+                'source': article.get('source', {}).get('name', 'Unknown'),
+                'description': description,
+                'sentiment_score': compound_score,
+                'sentiment_scale': 'vader',
+                'sentiment_label': self.get_sentiment_label(compound_score),
+                'sentiment_emoji': self.get_sentiment_emoji(compound_score),
+                'confidence': abs(compound_score)
+            }
+            articles.append(article_data)
+        return articles
+        
     def fetch_news_alpha_vantage(self, company_ticker: str) -> List[Dict]:
         """
         Fetch news articles using Alpha Vantage News API.
@@ -186,9 +271,13 @@ class NewsSentimentAnalyzer:
                     # or if you prefer VADER for consistency, you can re-analyze.
                     # For now, let's trust Alpha Vantage's score if provided and non-zero.
                     sentiment_score_for_article = overall_sentiment
+                    scale = 'alpha_vantage'
+                    label = self.get_alpha_vantage_label(overall_sentiment)
                     if abs(overall_sentiment) < 0.05: # If Alpha Vantage is neutral, use VADER for more nuanced score
                         vader_scores = self.analyze_sentiment(title)
                         sentiment_score_for_article = vader_scores['compound']
+                        scale = 'vader'
+                        label = self.get_sentiment_label(sentiment_score_for_article)
                     
                     article_data = {
                         'title': title,
@@ -197,8 +286,9 @@ class NewsSentimentAnalyzer:
                         'source': article.get('source', 'Unknown'),
                         'description': article.get('summary', ''),
                         'sentiment_score': sentiment_score_for_article,
-                        'sentiment_label': self.get_sentiment_label(sentiment_score_for_article),
-                        'sentiment_emoji': self.get_sentiment_emoji(sentiment_score_for_article),
+                        'sentiment_scale': scale,
+                        'sentiment_label': label,
+                        'sentiment_emoji': SENTIMENT_EMOJI[label],
                         'confidence': abs(sentiment_score_for_article)
                     }
                     articles.append(article_data)
@@ -212,7 +302,97 @@ class NewsSentimentAnalyzer:
             logger.error(f"Unexpected error in fetch_news_alpha_vantage: {e}")
             return []
         
-    def get_company_news(self, company_name: str, ticker: str = None, limit: int = 10) -> List[Dict]:
+    def fetch_news_alpha_vantage_multi(self, tickers: List[str], limit: int = 200,
+                                       min_relevance: float = 0.1) -> Dict[str, List[Dict]]:
+        """
+        Fetch Alpha Vantage news once and split it per ticker.
+        
+        Alpha Vantage only returns articles that mention every ticker in its `tickers`
+        filter, so the request filters on the first (main) ticker only and the other
+        tickers' articles are picked out of the same feed by their ticker_sentiment
+        entries. Scores are Alpha Vantage's per ticker sentiment, no VADER re-scoring.
+        
+        Args:
+            tickers (List[str]): Main ticker first, followed by e.g. its competitors
+            limit (int): Articles to request (Alpha Vantage allows up to 1000)
+            min_relevance (float): Skip mentions with a lower relevance_score
+            
+        Returns:
+            Dict[str, List[Dict]]: Articles per requested ticker (empty list if none)
+        """
+        wanted = [t.upper() for t in dict.fromkeys(tickers) if t]
+        by_ticker = {ticker: [] for ticker in wanted}
+        if not wanted or not self.alpha_vantage_key:
+            if not self.alpha_vantage_key:
+                logger.error("Alpha Vantage API key not found in environment variables")
+            return by_ticker
+        
+        params = {
+            'function': 'NEWS_SENTIMENT',
+            'tickers': wanted[0],
+            'limit': limit,
+            'apikey': self.alpha_vantage_key
+        }
+        
+        try:
+            response = requests.get(self.alpha_vantage_news_url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching news from Alpha Vantage: {e}")
+            return by_ticker
+        except ValueError as e:
+            logger.error(f"Invalid JSON from Alpha Vantage news: {e}")
+            return by_ticker
+        
+        for article in data.get('feed', []):
+            for mention in article.get('ticker_sentiment', []):
+                ticker = mention.get('ticker', '').upper()
+                if ticker not in by_ticker:
+                    continue
+                try:
+                    relevance = float(mention.get('relevance_score', 0))
+                    score = float(mention.get('ticker_sentiment_score', 0))
+                except ValueError:
+                    continue
+                if relevance < min_relevance:
+                    continue
+                label = self.get_alpha_vantage_label(score)
+                by_ticker[ticker].append({
+                    'title': article.get('title', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('time_published', ''),
+                    'source': article.get('source', 'Unknown'),
+                    'description': article.get('summary', ''),
+                    'sentiment_score': score,
+                    'sentiment_scale': 'alpha_vantage',
+                    'sentiment_label': label,
+                    'sentiment_emoji': SENTIMENT_EMOJI[label],
+                    'confidence': relevance,
+                    'relevance_score': relevance,
+                })
+        return by_ticker
+        
+    def get_alpha_vantage_label(self, ticker_sentiment_score: float) -> str:
+        """
+        Text label for an Alpha Vantage ticker_sentiment_score (Bullish/Bearish bands).
+        
+        Args:
+            ticker_sentiment_score (float): Alpha Vantage per ticker score (-1 to 1)
+            
+        Returns:
+            str: Text label for sentiment
+        """
+        if ticker_sentiment_score >= ALPHA_VANTAGE_NEUTRAL_BAND:
+            return "Positive"
+        elif ticker_sentiment_score <= -ALPHA_VANTAGE_NEUTRAL_BAND:
+            return "Negative"
+        else:
+            return "Neutral"
+        
+    def get_company_news(self, company_name: str, ticker: str = None, limit: int = 10,
+                         alpha_vantage_articles: Optional[List[Dict]] = None,
+                         newsapi_articles: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Get news articles for a company using multiple sources.
         
@@ -220,6 +400,10 @@ class NewsSentimentAnalyzer:
             company_name (str): Name of the company
             ticker (str): Stock ticker symbol (optional)
             limit (int): Maximum number of articles to return
+            alpha_vantage_articles (List[Dict]): Already fetched Alpha Vantage articles
+                (e.g. from fetch_news_alpha_vantage_multi), skips the Alpha Vantage call
+            newsapi_articles (List[Dict]): Already fetched NewsAPI articles
+                (e.g. from fetch_news_newsapi_multi), skips the NewsAPI call
             
         Returns:
             List[Dict]: Sorted list of news articles with sentiment analysis
@@ -227,11 +411,14 @@ class NewsSentimentAnalyzer:
         all_articles = []
         
         # Try NewsAPI first
-        newsapi_articles = self.fetch_news_newsapi(company_name)
+        if newsapi_articles is None:
+            newsapi_articles = self.fetch_news_newsapi(company_name)
         all_articles.extend(newsapi_articles)
         
         # Try Alpha Vantage if ticker is provided
-        if ticker and self.alpha_vantage_key:
+        if alpha_vantage_articles is not None:
+            all_articles.extend(alpha_vantage_articles)
+        elif ticker and self.alpha_vantage_key:
             av_articles = self.fetch_news_alpha_vantage(ticker)
             all_articles.extend(av_articles)
         
@@ -284,33 +471,54 @@ class NewsSentimentAnalyzer:
         
         return output
         
+    def normalized_score(self, article: Dict) -> float:
+        """
+        An article's score on VADER's compound scale.
+        
+        Alpha Vantage scores are rescaled so their neutral band (±0.15) lines up with
+        VADER's (±0.05), so articles from both sources can be averaged and counted together.
+        
+        Args:
+            article (Dict): Article with sentiment_score and sentiment_scale
+            
+        Returns:
+            float: Score between -1 and 1
+        """
+        score = article['sentiment_score']
+        if article.get('sentiment_scale') == 'alpha_vantage':
+            score = max(-1.0, min(1.0, score * VADER_NEUTRAL_BAND / ALPHA_VANTAGE_NEUTRAL_BAND))
+        return score
+        
     def get_sentiment_summary(self, articles: List[Dict]) -> Dict[str, any]:
         """
-        Get overall sentiment summary from articles.
+        Overall sentiment summary of articles from any source.
+        
+        Counts follow each article's own label. Averages are taken over normalized_score(),
+        the weighted one by relevance_score (1 for articles without one), and the overall
+        label comes from the weighted average.
         
         Args:
             articles (List[Dict]): List of news articles
             
         Returns:
-            Dict: Summary statistics
+            Dict: Summary statistics, empty if there are no articles
         """
         if not articles:
             return {}
         
-        sentiments = [article['sentiment_score'] for article in articles]
-        
-        positive_count = sum(1 for s in sentiments if s >= 0.05)
-        negative_count = sum(1 for s in sentiments if s <= -0.05)
-        neutral_count = len(sentiments) - positive_count - negative_count
-        
-        average_sentiment = sum(sentiments) / len(sentiments)
+        labels = [article['sentiment_label'] for article in articles]
+        sentiments = [self.normalized_score(article) for article in articles]
+        weights = [article.get('relevance_score', 1.0) for article in articles]
+        total_weight = sum(weights)
+        weighted = sum(s * w for s, w in zip(sentiments, weights)) / total_weight if total_weight else 0.0
         
         return {
             'total_articles': len(articles),
-            'positive_count': positive_count,
-            'negative_count': negative_count,
-            'neutral_count': neutral_count,
-            'average_sentiment': average_sentiment,
-            'overall_sentiment_label': self.get_sentiment_label(average_sentiment),
-            'overall_sentiment_emoji': self.get_sentiment_emoji(average_sentiment)
-        } 
\ No newline at end of file
+            'positive_count': labels.count("Positive"),
+            'negative_count': labels.count("Negative"),
+            'neutral_count': labels.count("Neutral"),
+            'average_sentiment': sum(sentiments) / len(sentiments),
+            'weighted_sentiment': weighted,
+            'overall_sentiment_label': self.get_sentiment_label(weighted),
+            'overall_sentiment_emoji': self.get_sentiment_emoji(weighted)
+        }
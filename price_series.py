@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+
+class PriceSeries:
+    """
+    Compact daily price series.
+
+    Prices live in one float array and dates in an int32 array of days since
+    1970-01-01, so a cached 3 month series is two small buffers instead of
+    hundreds of Python floats and date strings. Conversion to the lists the
+    frontend expects only happens in to_json().
+    """
+    __slots__ = ("ticker", "days", "prices")
+
+    def __init__(self, days, prices, ticker: Optional[str] = None, dtype=np.float64):
+        self.ticker = ticker
+        self.days = np.asarray(days, dtype=np.int32)
+        self.prices = np.asarray(prices, dtype=dtype)
+        if self.days.shape != self.prices.shape:
+            raise ValueError(f"days and prices differ in length ({self.days.size} != {self.prices.size})")
+
+    @staticmethod
+    def _index_to_days(index) -> np.ndarray:
+        # yfinance indexes are tz-aware, keep the exchange's calendar date rather than the UTC one
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        return index.values.astype("datetime64[D]").astype(np.int32)
+
+    @classmethod
+    def from_history(cls, history, column: str = "Close", ticker: Optional[str] = None, dtype=np.float64) -> "PriceSeries":
+        """
+        Build a series from a yfinance history DataFrame.
+
+        Args:
+            history (pandas.DataFrame): Frame indexed by date
+            column (str): Price column to keep
+            ticker (str): Stock ticker symbol (optional)
+        """
+        values = history[column].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        return cls(cls._index_to_days(history.index)[valid], values[valid], ticker, dtype)
+
+    @classmethod
+    def from_frame(cls, closes, dtype=np.float64) -> Dict[str, "PriceSeries"]:
+        """
+        Split a date x ticker price matrix (e.g. yf.download(...)["Close"]) into one series per ticker.
+        Tickers without any price are left out.
+        """
+        days = cls._index_to_days(closes.index)
+        matrix = closes.to_numpy(dtype=np.float64)
+        valid = ~np.isnan(matrix)
+        return {
+            ticker: cls(days[valid[:, i]], matrix[valid[:, i], i], ticker, dtype)
+            for i, ticker in enumerate(closes.columns)
+            if valid[:, i].any()
+        }
+
+    def __len__(self):
+        return self.prices.size
+
+    def __repr__(self):
+        return f"PriceSeries({self.ticker!r}, {len(self)} days)"
+
+    @property
+    def last(self) -> Optional[float]:
+        return round(float(self.prices[-1]), 2) if self.prices.size else None
+
+    def rounded(self, decimals: int = 2) -> np.ndarray:
+        # Round in float64 even if a caller picked float32, which loses cents on large prices
+        return np.round(self.prices.astype(np.float64), decimals)
+
+    def time_labels(self) -> List[str]:
+        return np.datetime_as_string(self.days.astype("datetime64[D]"), unit="D").tolist()
+
+    def to_json(self, decimals: int = 2) -> Tuple[List[float], List[str]]:
+        """(stock_prices, time_labels) lists in the shape the API responses use."""
+        return self.rounded(decimals).tolist(), self.time_labels()
@@ -0,0 +1,139 @@
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+
+class Trace:
+    """Stack samples of one profiled call, as collapsed stack -> sample count."""
+    __slots__ = ("id", "name", "label", "started_at", "duration", "interval", "samples")
+
+    def __init__(self, name: str, label: Optional[str], interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.label = label
+        self.started_at = time.time()
+        self.duration = None
+        self.interval = interval
+        self.samples = Counter()
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "label": self.label,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 1) if self.duration is not None else None,
+            "samples": sum(self.samples.values()),
+        }
+
+
+class _Sampler:
+    # Context manager that samples one thread's stack every `interval` seconds
+    def __init__(self, profiler: "Profiler", trace: Trace):
+        self.profiler = profiler
+        self.trace = trace
+        self._stop = threading.Event()
+        self._thread_id = None
+        self._thread = None
+        self._started = None
+
+    def __enter__(self) -> Trace:
+        self._thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.trace.id}", daemon=True)
+        self._thread.start()
+        return self.trace
+
+    def __exit__(self, *exc):
+        self.trace.duration = time.perf_counter() - self._started
+        self._stop.set()
+        self._thread.join()
+        self.profiler._store(self.trace)
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.trace.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                return
+            self.trace.samples[collapse(frame, self.trace.name)] += 1
+
+
+def collapse(frame, root: str) -> str:
+    """'root;outer (file.py:12);inner (file.py:40)', outermost frame first."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.append(root)
+    return ";".join(reversed(stack))
+
+
+class Profiler:
+    """
+    Sampling profiler for individual requests and jobs.
+
+    maybe_trace() profiles a random `sample_rate` fraction of calls, or every
+    call made with forced=True, and hands back a no-op context otherwise, so
+    an idle profiler costs one comparison per call. Finished traces are kept
+    in a ring buffer of the last `buffer_size` and exported in the collapsed
+    stack format flamegraph.pl and speedscope read.
+    Only the thread that entered the trace is sampled, work handed to a pool
+    shows up as time spent waiting on it.
+    """
+    def __init__(self, sample_rate: float = None, interval: float = None, buffer_size: int = None):
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+        self.interval = interval if interval is not None else float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+        self._traces = deque(maxlen=buffer_size or int(os.getenv("PROFILE_BUFFER_SIZE", 50)))
+        self._lock = threading.Lock()
+
+    def maybe_trace(self, name: str, label: Optional[str] = None, forced: bool = False):
+        if forced or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return self.trace(name, label)
+        return nullcontext()
+
+    def trace(self, name: str, label: Optional[str] = None) -> _Sampler:
+        return _Sampler(self, Trace(name, label, self.interval))
+
+    def _store(self, trace: Trace):
+        with self._lock:
+            self._traces.append(trace)
+
+    def traces(self) -> List[Dict]:
+        with self._lock:
+            return [trace.summary() for trace in reversed(self._traces)]
+
+    def collapsed(self, trace_id: Optional[str] = None, name: Optional[str] = None) -> str:
+        """
+        Collapsed stacks ('frame;frame;frame count' per line) of one trace,
+        or of every buffered trace (optionally only those called `name`) merged.
+        """
+        merged = Counter()
+        with self._lock:
+            for trace in self._traces:
+                if (trace_id is None or trace.id == trace_id) and (name is None or trace.name == name):
+                    merged.update(trace.samples)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(merged.items()))
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+def get_profiler() -> Profiler:
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler()
+    return _profiler
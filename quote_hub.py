@@ -0,0 +1,149 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+from market_data import get_market_provider
+from market_hours import is_market_open
+from rate_limit import get_limiter
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_latest_price(ticker: str) -> Optional[float]:
+    history = get_market_provider().history(ticker, "1d")
+    if history.empty:
+        return None
+    return round(float(history["Close"].iloc[-1]), 2)
+
+
+class QuoteHub:
+    """
+    Latest-quote snapshot shared by live dashboards and alert checks.
+
+    Each ticker with at least one subscriber gets a single poller thread, so
+    upstream calls grow with the number of distinct tickers, not viewers.
+    Every new quote is fanned out to the subscribers' queues. Polling is
+    fast during market hours and slows down while the market is closed.
+    Pollers are background work: a poll the yfinance rate limiter refuses is
+    skipped, so polling never takes budget user requests have already used.
+    """
+    def __init__(self, fetch: Callable[[str], Optional[float]] = fetch_latest_price,
+                 open_interval: float = None, closed_interval: float = None, queue_size: int = 100):
+        self.fetch = fetch
+        self.open_interval = open_interval or float(os.getenv("QUOTE_INTERVAL_OPEN", 15))
+        self.closed_interval = closed_interval or float(os.getenv("QUOTE_INTERVAL_CLOSED", 300))
+        self.queue_size = queue_size
+        self._latest = {}  # ticker -> quote dict
+        self._subscribers = defaultdict(set)  # ticker -> {queue.Queue}
+        self._pollers = {}  # ticker -> threading.Event that stops the poller
+        self._skipped = 0  # polls refused by the rate limiter
+        self._lock = threading.Lock()
+
+    def interval(self) -> float:
+        return self.open_interval if is_market_open() else self.closed_interval
+
+    def subscribe(self, ticker: str, subscriber: queue.Queue = None) -> queue.Queue:
+        """
+        Start receiving quotes for a ticker. One queue can subscribe to several tickers.
+
+        Returns:
+            queue.Queue: Receives quote dicts, starting with the current snapshot if there is one
+        """
+        ticker = ticker.upper()
+        subscriber = subscriber or queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[ticker].add(subscriber)
+            latest = self._latest.get(ticker)
+            if ticker not in self._pollers:
+                stop = self._pollers[ticker] = threading.Event()
+                threading.Thread(target=self._poll, args=(ticker, stop), name=f"quote-{ticker}", daemon=True).start()
+        if latest:
+            self._offer(subscriber, latest)
+        return subscriber
+
+    def unsubscribe(self, ticker: str, subscriber: queue.Queue):
+        ticker = ticker.upper()
+        with self._lock:
+            self._subscribers[ticker].discard(subscriber)
+            if not self._subscribers[ticker]:
+                del self._subscribers[ticker]
+                stop = self._pollers.pop(ticker, None)
+                if stop:
+                    stop.set()
+
+    def latest(self, ticker: str, max_age: float = None) -> Optional[Dict]:
+        """The last quote for a ticker, None if there is none or it is older than max_age seconds."""
+        quote = self._latest.get(ticker.upper())
+        if quote is None or (max_age is not None and time.time() - quote["time"] > max_age):
+            return None
+        return quote
+
+    def publish(self, ticker: str, price: float) -> Dict:
+        """Record a new price (from a poller or any other fetch) and push it to subscribers."""
+        ticker = ticker.upper()
+        quote = {"ticker": ticker, "price": price, "time": time.time()}
+        with self._lock:
+            self._latest[ticker] = quote
+            subscribers = list(self._subscribers.get(ticker, ()))
+        for subscriber in subscribers:
+            self._offer(subscriber, quote)
+        return quote
+
+    def clear(self):
+        """Drop every snapshot, running pollers publish again on their next fetch."""
+        with self._lock:
+            self._latest.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "tickers": len(self._pollers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "snapshots": len(self._latest),
+                "skipped_polls": self._skipped,
+            }
+
+    @staticmethod
+    def _offer(subscriber, quote):
+        # A slow client loses its oldest quote rather than holding up everyone else
+        while True:
+            try:
+                subscriber.put_nowait(quote)
+                return
+            except queue.Full:
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _poll(self, ticker, stop):
+        limiter = get_limiter("yfinance")
+        while not stop.is_set():
+            if not limiter.try_acquire():
+                # Out of budget, the snapshot just stays as it is until the next tick
+                with self._lock:
+                    self._skipped += 1
+                stop.wait(self.interval())
+                continue
+            try:
+                price = self.fetch(ticker)
+                if price is not None:
+                    self.publish(ticker, price)
+            except Exception as e:
+                logger.error(f"Quote poll for {ticker} failed: {e}")
+            stop.wait(self.interval())
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+def get_quote_hub() -> QuoteHub:
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = QuoteHub()
+    return _hub
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+
+# provider -> (env var, default calls per minute)
+PROVIDER_LIMITS = {
+    "yfinance": ("YFINANCE_CALLS_PER_MIN", 120),
+    "alpha_vantage": ("ALPHA_VANTAGE_CALLS_PER_MIN", 5),
+    "newsapi": ("NEWS_API_CALLS_PER_MIN", 30),
+    "gemini": ("GEMINI_CALLS_PER_MIN", 15),
+}
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` calls every `per` seconds.
+
+    User requests always go through and just consume() tokens, background
+    jobs use try_acquire() so they back off when the provider is busy.
+    """
+    def __init__(self, rate: float, per: float = 60.0):
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, n: float = 1) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < n:
+                return False
+            self._tokens -= n
+            return True
+
+    def wait(self, n: float = 1, timeout: float = None) -> bool:
+        """Block until n tokens are available and take them, False if that would exceed timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(n):
+            with self._lock:
+                delay = (n - self._tokens) / self.fill_rate
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return False
+            time.sleep(max(delay, 0.01))
+        return True
+
+    def consume(self, n: float = 1):
+        with self._lock:
+            self._refill()
+            # Can go into debt so background work waits for user traffic to calm down
+            self._tokens = max(-self.capacity, self._tokens - n)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(provider: str) -> RateLimiter:
+    with _limiters_lock:
+        if provider not in _limiters:
+            env_var, default = PROVIDER_LIMITS.get(provider, (None, 60))
+            rate = float(os.getenv(env_var, default)) if env_var else default
+            _limiters[provider] = RateLimiter(rate)
+        return _limiters[provider]
@@ -0,0 +1,178 @@
+import zlib
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from price_series import PriceSeries
+
+# Trading days covered by each yfinance style period
+PERIOD_TRADING_DAYS = {
+    "1d": 1, "5d": 5, "1wk": 5, "1mo": 21, "3mo": 63, "6mo": 126,
+    "1y": 252, "2y": 504, "5y": 1260, "10y": 2520, "max": 2520,
+}
+
+SECTORS = [
+    "Technology", "Financials", "Healthcare", "Energy", "Consumer Discretionary",
+    "Consumer Staples", "Industrials", "Utilities", "Materials", "Communication Services",
+    "Real Estate",
+]
+
+HEADLINES = [
+    ("{name} beats earnings expectations as revenue surges", 1),
+    ("{name} shares rally after strong guidance", 1),
+    ("Analysts upgrade {name} on record growth", 1),
+    ("{name} announces new product line", 0),
+    ("{name} to present at industry conference", 0),
+    ("{name} files quarterly report", 0),
+    ("{name} misses estimates, shares slump", -1),
+    ("Regulators open investigation into {name}", -1),
+    ("{name} cuts outlook amid weak demand", -1),
+]
+
+
+class SyntheticMarket:
+    """
+    Deterministic fake market for load testing and offline development.
+
+    Every ticker gets its own random stream derived from (seed, ticker), so
+    prices, market caps, news and competitor sets are identical across runs
+    and processes no matter in which order or batch they are requested.
+    Prices follow a geometric Brownian motion over a fixed window of
+    business days ending at `end`, shorter periods are its tail.
+    Select it with MARKET_PROVIDER=synthetic (see market_data).
+    """
+    name = "synthetic"
+
+    def __init__(self, seed: int = 0, universe_size: int = 5000, max_days: int = 2520, end=None):
+        self.seed = seed
+        self.universe_size = universe_size
+        self.max_days = max_days
+        self.end = pd.Timestamp(end).normalize() if end is not None else pd.Timestamp.today().normalize()
+        self._dates = pd.bdate_range(end=self.end, periods=max_days)
+
+    def _rng(self, *parts) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32("|".join(map(str, parts)).encode())])
+
+    def _profile(self, ticker):
+        rng = self._rng("profile", ticker)
+        return {
+            "last_price": float(rng.lognormal(4.0, 0.8)),
+            "drift": float(rng.normal(0.07, 0.10)),
+            "volatility": float(rng.uniform(0.15, 0.60)),
+            "shares": int(rng.lognormal(20.0, 1.0)),
+        }
+
+    # --- universe ---------------------------------------------------------
+
+    def universe(self, size: Optional[int] = None) -> List[str]:
+        return [f"SYN{i:05d}" for i in range(size or self.universe_size)]
+
+    def company_name(self, ticker: str) -> str:
+        return f"{ticker} Holdings"
+
+    def resolve_ticker(self, company_name: str) -> str:
+        # Our own generated names map back to their ticker, anything else lands somewhere in the universe
+        name = company_name.strip()
+        if name.upper().startswith("SYN") and name.endswith(" Holdings"):
+            return name[:-len(" Holdings")].upper()
+        return f"SYN{zlib.crc32(name.lower().encode()) % self.universe_size:05d}"
+
+    def sector(self, ticker: str) -> str:
+        if ticker.startswith("SYN") and ticker[3:].isdigit():
+            return SECTORS[int(ticker[3:]) % len(SECTORS)]
+        return SECTORS[zlib.crc32(ticker.encode()) % len(SECTORS)]
+
+    # --- prices -----------------------------------------------------------
+
+    def _closes(self, ticker: str) -> np.ndarray:
+        profile = self._profile(ticker)
+        rng = self._rng("prices", ticker)
+        dt = 1.0 / 252
+        sigma = profile["volatility"]
+        shocks = rng.standard_normal(self.max_days)
+        log_returns = (profile["drift"] - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+        log_returns[0] = 0.0
+        # Anchor the path at its last day so current prices stay in a realistic range
+        path = np.cumsum(log_returns)
+        return profile["last_price"] * np.exp(path - path[-1])
+
+    def _days(self, period: str) -> int:
+        return min(PERIOD_TRADING_DAYS.get(period, 63), self.max_days)
+
+    def history(self, ticker: str, period: str = "3mo") -> pd.DataFrame:
+        """OHLCV frame shaped like yfinance's Ticker.history()."""
+        n = self._days(period)
+        closes = self._closes(ticker)
+        rng = self._rng("ohlcv", ticker)
+        sigma = self._profile(ticker)["volatility"] / np.sqrt(252)
+        gaps = np.exp(rng.normal(0.0, sigma / 2, self.max_days))
+        opens = np.concatenate(([closes[0]], closes[:-1])) * gaps
+        spread = np.abs(rng.normal(0.0, sigma, (2, self.max_days)))
+        highs = np.maximum(opens, closes) * (1 + spread[0])
+        lows = np.minimum(opens, closes) * (1 - spread[1])
+        volumes = rng.lognormal(15.0, 0.5, self.max_days).astype(np.int64)
+        frame = pd.DataFrame(
+            {"Open": opens, "High": highs, "Low": lows, "Close": closes, "Volume": volumes},
+            index=self._dates,
+        )
+        return frame.iloc[-n:]
+
+    def download(self, tickers: List[str], period: str = "3mo") -> pd.DataFrame:
+        """Multi-ticker frame shaped like yf.download(), columns are (field, ticker)."""
+        tickers = list(dict.fromkeys(tickers))
+        frame = pd.concat([self.history(ticker, period) for ticker in tickers], axis=1, keys=tickers)
+        return frame.swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+
+    def series(self, ticker: str, period: str = "3mo") -> PriceSeries:
+        n = self._days(period)
+        days = self._dates[-n:].values.astype("datetime64[D]").astype(np.int32)
+        return PriceSeries(days, self._closes(ticker)[-n:], ticker)
+
+    def market_cap(self, ticker: str) -> int:
+        return int(self._profile(ticker)["shares"] * self._closes(ticker)[-1])
+
+    def profile(self, ticker: str) -> Dict:
+        return {
+            "market_cap": self.market_cap(ticker),
+            "shares_outstanding": self._profile(ticker)["shares"],
+            "sector": self.sector(ticker),
+        }
+
+    # --- competitors and news --------------------------------------------
+
+    def summary(self, company_name: str) -> str:
+        ticker = self.resolve_ticker(company_name)
+        return f"{self.company_name(ticker)} is a synthetic {self.sector(ticker).lower()} company generated for testing."
+
+    def competitors(self, company_name: str, per_sector: int = 4) -> List[Dict]:
+        """Sectors and peers in the same shape query_gemini_llm returns."""
+        ticker = self.resolve_ticker(company_name)
+        sector_index = SECTORS.index(self.sector(ticker))
+        peers = np.arange(sector_index, self.universe_size, len(SECTORS))
+        rng = self._rng("competitors", ticker)
+        chosen = rng.choice(peers, size=min(per_sector + 1, peers.size), replace=False)
+        names = [self.company_name(f"SYN{i:05d}") for i in chosen if f"SYN{i:05d}" != ticker][:per_sector]
+        return [{"name": f"{SECTORS[sector_index]} Sector:", "competitors": names}]
+
+    def news(self, ticker: str, limit: int = 10) -> List[Dict]:
+        """Raw articles in NewsAPI's shape, headline tone follows the recent price trend."""
+        rng = self._rng("news", ticker, self.end.date())
+        closes = self._closes(ticker)
+        trend = np.sign(closes[-1] - closes[-6])
+        # Lean towards headlines matching the trend
+        weights = np.array([1.0 + trend * tone for _, tone in HEADLINES]) + 0.5
+        picks = rng.choice(len(HEADLINES), size=limit, p=weights / weights.sum())
+        hours_ago = np.sort(rng.integers(1, 24 * 7, size=limit))
+        name = self.company_name(ticker)
+        return [
+            {
+                "title": HEADLINES[pick][0].format(name=name),
+                "url": f"https://news.example.com/{ticker.lower()}/{i}",
+                "publishedAt": (self.end - timedelta(hours=int(hours))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "source": {"name": "Synthetic Wire"},
+                "description": "",
+            }
+            for i, (pick, hours) in enumerate(zip(picks, hours_ago))
+        ]
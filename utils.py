@@ -1,5 +1,7 @@
+import os
+import hmac
 from functools import wraps
-from flask import session, render_template
+from flask import session, render_template, request, jsonify
 
 # login required decorator for API routes
 def login_required(f):
@@ -9,3 +11,17 @@ def login_required(f):
             return render_template("FRONT.html", error="Please log in to continue.")
         return f(*args, **kwargs)
     return decorated
+
+# admin endpoints need the X-Admin-Token header to match the ADMIN_TOKEN env var,
+# they are disabled when ADMIN_TOKEN is not set
+def is_admin_request():
+    token = os.getenv("ADMIN_TOKEN")
+    return bool(token) and hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token)
+
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not is_admin_request():
+            return jsonify(success=False, error="Admin access required."), 403
+        return f(*args, **kwargs)
+    return decorated